@@ -2,31 +2,124 @@
 NLytics REST API
 Comprehensive API for programmatic access to all analytics functionality
 """
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, Response
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
+from functools import lru_cache
+from werkzeug.utils import secure_filename
+import hashlib
+import itertools
 import logging
+import threading
+import os
+import uuid
+import orjson
+import simdjson
+import xxhash
 import pandas as pd
 import numpy as np
 
 logger = logging.getLogger(__name__)
 
+# orjson serializes numpy scalars/arrays natively, so DataFrames can be
+# emitted column-by-column without boxing every cell into a Python object
+ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS | orjson.OPT_NAIVE_UTC
+
+
+def _serialize_dataframe(result):
+    """Columnar layout: each column stays one contiguous value sequence
+    instead of being materialized into per-row dicts by to_dict('records')
+
+    Numeric columns pass through as numpy arrays (orjson serializes
+    those natively); everything else must become Python lists first -
+    orjson has no native path for object arrays, so they would otherwise
+    be stringified wholesale by _orjson_default. Datetime columns go
+    through the list path too: orjson raises on NaT inside a datetime64
+    array (default= is never consulted for array elements, and the
+    preprocessor's errors='coerce' makes NaT routine), and tz-aware
+    columns come out of to_numpy() as object arrays anyway.
+    """
+    data = {}
+    for col in result.columns:
+        series = result[col]
+        if pd.api.types.is_numeric_dtype(series):
+            data[str(col)] = series.to_numpy()
+        elif pd.api.types.is_datetime64_any_dtype(series):
+            data[str(col)] = [None if v is pd.NaT else v for v in series.tolist()]
+        else:
+            data[str(col)] = series.tolist()
+    return {
+        'columns': result.columns.tolist(),
+        'data': data
+    }
+
+
+# Exact-type dispatch table: one dict lookup replaces the isinstance
+# chain for the overwhelmingly common result types. numpy scalars and
+# arrays pass through - orjson serializes them via OPT_SERIALIZE_NUMPY.
+_SERIALIZERS = {
+    pd.DataFrame: _serialize_dataframe,
+    pd.Series: lambda result: result.to_dict(),
+}
+
 
 def serialize_result(result):
     """Convert result to JSON-serializable format"""
+    handler = _SERIALIZERS.get(type(result))
+    if handler is not None:
+        return handler(result)
+    # Subclasses miss the exact-type table; fall back to isinstance
     if isinstance(result, pd.DataFrame):
-        return result.to_dict('records')
-    elif isinstance(result, pd.Series):
+        return _serialize_dataframe(result)
+    if isinstance(result, pd.Series):
         return result.to_dict()
-    elif isinstance(result, (np.integer, np.int64, np.int32)):
-        return int(result)
-    elif isinstance(result, (np.floating, np.float64, np.float32)):
-        return float(result)
-    elif isinstance(result, np.ndarray):
-        return result.tolist()
-    elif isinstance(result, np.bool_):
-        return bool(result)
     return result
 
+
+def _orjson_default(obj):
+    """Fallback for types orjson doesn't handle natively"""
+    if isinstance(obj, (pd.Timestamp, datetime)):
+        return obj.isoformat()
+    return str(obj)
+
+
+def orjson_response(payload, status=200):
+    """Build a JSON response via orjson (handles numpy without conversion)"""
+    return Response(
+        orjson.dumps(payload, default=_orjson_default, option=ORJSON_OPTIONS),
+        status=status,
+        mimetype='application/json'
+    )
+
+
+NDJSON_CHUNK_ROWS = 4096
+
+
+def ndjson_stream(df):
+    """
+    Stream a DataFrame as chunked NDJSON (one JSON array of records per line)
+
+    Large results never get materialized into one giant list + string:
+    the server holds at most one chunk at a time and the client can start
+    parsing as soon as the first line arrives.
+    """
+    def generate():
+        for start in range(0, len(df), NDJSON_CHUNK_ROWS):
+            chunk = df.iloc[start:start + NDJSON_CHUNK_ROWS]
+            yield orjson.dumps(
+                chunk.to_dict('records'),
+                default=_orjson_default,
+                option=ORJSON_OPTIONS
+            ) + b'\n'
+
+    return Response(generate(), mimetype='application/x-ndjson')
+
+
+def wants_stream():
+    """Check whether the client asked for a streamed NDJSON response"""
+    return request.args.get('stream', '').lower() == 'true'
+
 # This will be initialized from main.py with all the service instances
 api_blueprint = Blueprint('api', __name__, url_prefix='/api/v1')
 
@@ -34,12 +127,273 @@ api_blueprint = Blueprint('api', __name__, url_prefix='/api/v1')
 services = {}
 sessions = {}
 
+# Reusable SIMD JSON parser for request bodies (~2GB/s vs stdlib json)
+_json_parser = simdjson.Parser()
+
+
+def get_request_json():
+    """Parse the request body with simdjson, skipping werkzeug's caching
+
+    recursive=True materializes plain dicts/lists so the parser buffer
+    can be reused safely by the next request. Returns None on invalid
+    or empty bodies, like request.get_json(silent=True).
+    """
+    body = request.get_data(cache=False)
+    if not body:
+        return None
+    try:
+        return _json_parser.parse(body, recursive=True)
+    except ValueError:
+        return None
+
+
+# Upload target from config, created once at import, not per request
+from config import UPLOAD_FOLDER as UPLOAD_DIR
+UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+
+# Monotonic per-process counter for throwaway API session ids - cheaper and
+# collision-safe compared to stringifying a wall-clock timestamp
+_api_session_counter = itertools.count()
+
+# Background workers for async /analyze requests. The pipeline is I/O-heavy
+# (LLM round-trips), so threads overlap well despite the GIL. Task state
+# lives in the shared session store rather than a per-process dict, so a
+# poll reaches the task no matter which gunicorn worker serves it.
+_analyze_executor = ThreadPoolExecutor(max_workers=4)
+
+
+def _task_key(task_id):
+    return f"task_{task_id}"
+
+
+def _store_task_outcome(task_id, future):
+    """Done-callback: persist an async task's outcome to the shared store
+
+    The payload is stored pre-serialized: numpy arrays inside it would
+    not survive the Redis store's msgpack encoding, and the bytes can be
+    spliced straight into the poll response.
+    """
+    try:
+        payload, status = future.result()
+        record = {
+            'status': 'completed' if status == 200 else 'failed',
+            'http_status': status,
+            'body': orjson.dumps(payload, default=_orjson_default, option=ORJSON_OPTIONS),
+        }
+    except Exception as e:
+        logger.error("Async analyze task %s failed: %s", task_id, e, exc_info=True)
+        record = {'status': 'failed', 'http_status': 500, 'error': str(e)}
+    sessions[_task_key(task_id)] = record
+
+# Pool for overlapping independent LLM calls inside one pipeline run
+_pipeline_executor = ThreadPoolExecutor(max_workers=4)
+
 
 def init_api(service_dict, session_store):
     """Initialize API with service instances and session store"""
     global services, sessions
     services = service_dict
     sessions = session_store
+    # Warm the services in the background so the first real request pays
+    # steady-state latency instead of first-call costs
+    threading.Thread(target=_warmup_services, daemon=True).start()
+
+
+def _warmup_services():
+    """Run a tiny DataFrame through the local pipeline stages at boot
+
+    Primes pandas/numpy code paths, the validator's compiled patterns,
+    the executor's numba JIT cache and the orjson serializer. LLM-backed
+    stages are deliberately skipped - warming them would spend real API
+    calls on a throwaway query.
+    """
+    try:
+        df = pd.DataFrame({'x': [1.0, 2.0, 3.0], 'y': ['a', 'b', 'c']})
+        services['preprocessor'].preprocess(df, 'warmup.csv')
+        code = "result = df.nlargest(2, 'x')"
+        services['code_validator'].validate(code, frame_columns(df))
+        execution_result = services['safe_executor'].execute(code, df)
+        orjson.dumps(
+            serialize_result(execution_result['result']),
+            default=_orjson_default,
+            option=ORJSON_OPTIONS
+        )
+        logger.info("Service warmup complete")
+    except Exception as e:
+        logger.warning("Service warmup failed: %s", e)
+
+
+@lru_cache(maxsize=64)
+def _load_cached(file_path, mtime):
+    """Load a processed file, memoized on (path, mtime)
+
+    mtime participates in the cache key so a re-uploaded/re-processed file
+    invalidates the stale entry automatically.
+    """
+    return services['file_handler'].load_file(file_path)
+
+
+def load_session_dataframe(processed_path):
+    """Load a session's processed DataFrame through the mtime-keyed cache"""
+    return _load_cached(processed_path, os.path.getmtime(processed_path))
+
+
+def frame_columns(df):
+    """Column list for a frame, computed once and stashed in df.attrs"""
+    columns = df.attrs.get('_column_list')
+    if columns is None:
+        columns = df.columns.tolist()
+        df.attrs['_column_list'] = columns
+    return columns
+
+
+def frame_dtypes(df):
+    """{column: dtype-string} for a frame, computed once per frame"""
+    dtypes = df.attrs.get('_dtypes_str')
+    if dtypes is None:
+        dtypes = {col: str(dtype) for col, dtype in df.dtypes.items()}
+        df.attrs['_dtypes_str'] = dtypes
+    return dtypes
+
+
+# Per-column sample size for fingerprinting large frames
+_FINGERPRINT_SAMPLE_BYTES = 64 * 1024
+
+
+def dataset_fingerprint(df):
+    """
+    Content fingerprint of a DataFrame via xxh3 (SIMD-accelerated)
+
+    Hashes column names plus the raw bytes of each numeric column (first
+    and last 64KB for large columns), so two datasets with the same shape
+    but different contents no longer collide. Memoized in df.attrs.
+    """
+    cached = df.attrs.get('_fingerprint')
+    if cached is not None:
+        return cached
+
+    digest = xxhash.xxh3_64()
+    digest.update(str(len(df)).encode())
+    for col in frame_columns(df):
+        digest.update(str(col).encode('utf-8'))
+        series = df[col]
+        if series.dtype == object:
+            continue
+        arr = series.to_numpy()
+        if arr.nbytes <= 2 * _FINGERPRINT_SAMPLE_BYTES:
+            digest.update(arr.tobytes(order='C'))
+        else:
+            n = max(1, _FINGERPRINT_SAMPLE_BYTES // max(1, arr.itemsize))
+            digest.update(np.ascontiguousarray(arr[:n]).tobytes())
+            digest.update(np.ascontiguousarray(arr[-n:]).tobytes())
+
+    fingerprint = digest.hexdigest()
+    df.attrs['_fingerprint'] = fingerprint
+    return fingerprint
+
+
+class IntentPlanCache:
+    """
+    LRU cache for the LLM-backed pipeline stages (intent, refinement,
+    plan, code generation + validation)
+
+    These calls dominate end-to-end latency, so repeat queries against the
+    same dataset skip the Groq round-trips entirely. Failed validations are
+    cached too, short-circuiting known-bad queries.
+    """
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+
+    @staticmethod
+    def make_key(query, df):
+        """Key on the query text plus a content fingerprint of the data"""
+        query_digest = hashlib.blake2b(query.encode('utf-8'), digest_size=16).digest()
+        return (query_digest, dataset_fingerprint(df))
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key, value):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+
+intent_plan_cache = IntentPlanCache(maxsize=256)
+
+
+def run_query_pipeline(query, df, conversation_history=None):
+    """
+    Run the intent → refine → plan → generate → validate stages, cached
+    on (query, dataset fingerprint)
+
+    Returns:
+        (intent_result, refinement, query_to_use, execution_plan,
+         code_result, validation_result)
+    """
+    cache_key = IntentPlanCache.make_key(query, df)
+    cached = intent_plan_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    intent_result = services['intent_detector'].detect_intent(
+        query,
+        df,
+        conversation_history or []
+    )
+
+    dataset_summary = {'row_count': len(df), 'columns': frame_columns(df)}
+
+    # Refinement and planning are both ~hundreds of ms of Groq I/O, so
+    # speculatively plan the original query while refinement runs; only
+    # re-plan if refinement actually changed the query text.
+    plan_future = _pipeline_executor.submit(
+        services['query_planner'].create_plan, query, intent_result, dataset_summary
+    )
+
+    dataset_context = f"{len(df)} rows, {len(df.columns)} columns"
+    refinement = services['query_refiner'].refine_query(query, intent_result, dataset_context)
+    query_to_use = refinement.get('refined_query', query) if refinement.get('refinement_applied') else query
+
+    if query_to_use == query:
+        execution_plan = plan_future.result()
+    else:
+        execution_plan = services['query_planner'].create_plan(
+            query_to_use,
+            intent_result,
+            dataset_summary
+        )
+
+    code_result = services['code_generator'].generate_code(
+        query_to_use,
+        intent_result,
+        execution_plan,
+        frame_columns(df),
+        frame_dtypes(df)
+    )
+
+    validation_result = services['code_validator'].validate(
+        code_result['code'],
+        frame_columns(df)
+    )
+
+    pipeline_result = (
+        intent_result, refinement, query_to_use,
+        execution_plan, code_result, validation_result
+    )
+    # Cache only clean runs: fallback code (code_result carries 'error'
+    # after a Groq failure) or a failed validation is transient, and
+    # caching it would keep replaying the broken result for this
+    # query/dataset until LRU eviction
+    if 'error' not in code_result and validation_result['valid']:
+        intent_plan_cache.put(cache_key, pipeline_result)
+    return pipeline_result
 
 
 @api_blueprint.route('/analyze', methods=['POST'])
@@ -91,161 +445,187 @@ def analyze():
         if request.content_type and 'multipart/form-data' in request.content_type:
             # File upload
             if 'file' not in request.files:
-                return jsonify({'error': 'No file provided'}), 400
+                return orjson_response({'error': 'No file provided'}, 400)
             
             file = request.files['file']
             query = request.form.get('query', '')
             return_code = request.form.get('return_code', 'true').lower() == 'true'
             return_viz = request.form.get('return_visualization', 'true').lower() == 'true'
+            run_async = request.form.get('async', 'false').lower() == 'true'
         else:
             # JSON request
-            data = request.get_json()
+            data = get_request_json()
             if not data:
-                return jsonify({'error': 'Invalid request body'}), 400
+                return orjson_response({'error': 'Invalid request body'}, 400)
             
             query = data.get('query', '')
             return_code = data.get('return_code', True)
             return_viz = data.get('return_visualization', True)
             
             # Handle data_url or inline data later
-            return jsonify({'error': 'File upload required in current version'}), 400
+            return orjson_response({'error': 'File upload required in current version'}, 400)
         
         if not query:
-            return jsonify({'error': 'Query is required'}), 400
+            return orjson_response({'error': 'Query is required'}, 400)
         
         # Create temporary session for this request
-        session_id = f"api_{datetime.now().timestamp()}"
+        session_id = f"api_{os.getpid()}_{next(_api_session_counter)}"
         
         # Upload and process file (same logic as main.py upload)
-        import uuid
-        from werkzeug.utils import secure_filename
-        import os
-        
         filename = secure_filename(file.filename)
         file_id = str(uuid.uuid4())
-        upload_folder = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'uploads')
-        os.makedirs(upload_folder, exist_ok=True)
-        
-        file_path = os.path.join(upload_folder, f"{file_id}_{filename}")
-        file.save(file_path)
-        
-        df = services['file_handler'].load_file(file_path)
-        
-        # Preprocess
-        processed_df, preprocessing_manifest = services['preprocessor'].preprocess(df, filename)
-        
-        # Detect intent
-        intent_result = services['intent_detector'].detect_intent(
-            query, 
-            processed_df,
-            []
-        )
-        
-        # Refine query
-        dataset_context = f"{len(processed_df)} rows, {len(processed_df.columns)} columns"
-        refinement = services['query_refiner'].refine_query(query, intent_result, dataset_context)
-        query_to_use = refinement.get('refined_query', query) if refinement.get('refinement_applied') else query
-        
-        # Create plan
-        execution_plan = services['query_planner'].create_plan(
-            query_to_use,
-            intent_result,
-            {'row_count': len(processed_df), 'columns': processed_df.columns.tolist()}
-        )
-        
-        # Generate and execute code
-        df_dtypes = {col: str(dtype) for col, dtype in processed_df.dtypes.items()}
-        code_result = services['code_generator'].generate_code(
-            query_to_use,
-            intent_result,
-            execution_plan,
-            processed_df.columns.tolist(),
-            df_dtypes
-        )
-        
-        # Validate
-        validation_result = services['code_validator'].validate(
-            code_result['code'],
-            processed_df.columns.tolist()
-        )
-        
-        if not validation_result['valid']:
-            return jsonify({
-                'error': 'Code validation failed',
-                'details': validation_result.get('errors', [])
-            }), 500
+        file_path = str(UPLOAD_DIR / f"{file_id}_{filename}")
+        services['file_handler'].save_upload(file, file_path)
+        
+        # Async mode: enqueue the pipeline and hand back a task id to poll
+        if run_async:
+            task_id = uuid.uuid4().hex[:16]
+            sessions[_task_key(task_id)] = {'status': 'running'}
+            future = _analyze_executor.submit(
+                _run_analyze_pipeline, file_path, filename, query, return_code, return_viz
+            )
+            future.add_done_callback(
+                lambda f, tid=task_id: _store_task_outcome(tid, f)
+            )
+            return orjson_response({
+                'task_id': task_id,
+                'status': 'pending',
+                'poll': f'/api/v1/tasks/{task_id}'
+            }, 202)
+        
+        payload, status = _run_analyze_pipeline(file_path, filename, query, return_code, return_viz)
+        return orjson_response(payload, status)
         
-        # Execute
-        execution_result = services['safe_executor'].execute(
-            code_result['code'],
-            processed_df
-        )
-        
-        if not execution_result['success']:
-            return jsonify({
-                'error': 'Execution failed',
-                'details': execution_result.get('error', 'Unknown error')
-            }), 500
-        
-        # Generate insights
-        insights = services['insight_generator'].generate_insights(
-            execution_result['result'],
-            query_to_use,
-            execution_result.get('execution_time', 0)
-        )
-        
-        # Synthesize answer
-        query_context = {
-            'refined_query': query_to_use if refinement.get('refinement_applied') else None,
+    except Exception as e:
+        logger.error("API analyze error: %s", e, exc_info=True)
+        return orjson_response({'error': str(e)}, 500)
+
+
+def run_full_pipeline(df, query, conversation_history=None, want_code=True, want_viz=True):
+    """
+    Shared end-to-end pipeline for /analyze and /query: execute the
+    generated code, build insights and the plain-language answer
+
+    Returns:
+        (payload, status) ready for serialization
+    """
+    # Intent → refinement → plan → code → validation (LRU-cached on
+    # query + dataset fingerprint, so repeat queries skip the LLM calls)
+    (intent_result, refinement, query_to_use, execution_plan,
+     code_result, validation_result) = run_query_pipeline(query, df, conversation_history)
+    
+    if not validation_result['valid']:
+        return {
+            'error': 'Code validation failed',
+            'details': validation_result.get('errors', [])
+        }, 500
+    
+    # Execute
+    execution_result = services['safe_executor'].execute(code_result['code'], df)
+    
+    if not execution_result['success']:
+        return {
+            'error': 'Execution failed',
+            'details': execution_result.get('error', 'Unknown error')
+        }, 500
+    
+    # Generate insights
+    insights = services['insight_generator'].generate_insights(
+        execution_result['result'],
+        query_to_use,
+        execution_result.get('execution_time', 0)
+    )
+    
+    # Synthesize answer
+    query_context = {
+        'refined_query': query_to_use if refinement.get('refinement_applied') else None,
+        'execution_time': execution_result.get('execution_time', 0)
+    }
+    answer = services['answer_synthesizer'].synthesize_answer(
+        query_to_use,
+        execution_result['result'],
+        query_context
+    )
+    
+    # Build response
+    response = {
+        'success': True,
+        'status': 'completed',
+        'query': {
+            'original': query,
+            'refined': query_to_use if refinement.get('refinement_applied') else None,
+            'intent': {
+                'type': intent_result.get('query_type'),
+                'explanation': intent_result.get('explanation')
+            }
+        },
+        'result': {
+            'data': serialize_result(execution_result['result']),
+            'type': str(type(execution_result['result']).__name__)
+        },
+        'insights': {
+            'narrative': insights.get('narrative', ''),
+            'key_findings': insights.get('key_findings', []),
+            'recommendations': insights.get('recommendations', [])
+        },
+        'answer': answer
+    }
+    
+    # Optional fields
+    if want_code:
+        response['code'] = {
+            'generated': code_result['code'],
+            'language': 'python',
+            'explanation': code_result.get('explanation', ''),
             'execution_time': execution_result.get('execution_time', 0)
         }
-        answer = services['answer_synthesizer'].synthesize_answer(
-            query_to_use,
-            execution_result['result'],
-            query_context
+    
+    if want_viz:
+        response['visualization'] = insights.get('visualization')
+    
+    return response, 200
+
+
+def _run_analyze_pipeline(file_path, filename, query, return_code, return_viz):
+    """Load + preprocess an uploaded file, then run the shared pipeline"""
+    df = services['file_handler'].load_file(file_path)
+    processed_df, preprocessing_manifest = services['preprocessor'].preprocess(df, filename)
+    return run_full_pipeline(processed_df, query, want_code=return_code, want_viz=return_viz)
+
+
+@api_blueprint.route('/tasks/<task_id>', methods=['GET'])
+def get_task(task_id):
+    """
+    Poll an async /analyze task
+    
+    Response:
+        {"task_id": "...", "status": "running|completed|failed", ...}
+    
+    Finished tasks are one-shot: the record is popped from the store as
+    soon as its result is served, so payloads don't accumulate.
+    """
+    record = sessions.get(_task_key(task_id))
+    if record is None:
+        return orjson_response({'error': 'Task not found'}, 404)
+    
+    if record['status'] == 'running':
+        return orjson_response({'task_id': task_id, 'status': 'running'})
+    
+    sessions.pop(_task_key(task_id), None)
+    body = record.get('body')
+    if body is not None:
+        # Splice the pre-serialized payload into the envelope directly
+        return Response(
+            b'{"task_id":"' + task_id.encode() + b'","status":"'
+            + record['status'].encode() + b'","result":' + bytes(body) + b'}',
+            status=record['http_status'],
+            mimetype='application/json'
         )
-        
-        # Build response
-        response = {
-            'success': True,
-            'status': 'completed',
-            'query': {
-                'original': query,
-                'refined': query_to_use if refinement.get('refinement_applied') else None,
-                'intent': {
-                    'type': intent_result.get('query_type'),
-                    'explanation': intent_result.get('explanation')
-                }
-            },
-            'result': {
-                'data': serialize_result(execution_result['result']),
-                'type': str(type(execution_result['result']).__name__)
-            },
-            'insights': {
-                'narrative': insights.get('narrative', ''),
-                'key_findings': insights.get('key_findings', []),
-                'recommendations': insights.get('recommendations', [])
-            },
-            'answer': answer
-        }
-        
-        # Optional fields
-        if return_code:
-            response['code'] = {
-                'generated': code_result['code'],
-                'language': 'python',
-                'explanation': code_result.get('explanation', ''),
-                'execution_time': execution_result.get('execution_time', 0)
-            }
-        
-        if return_viz and insights.get('visualization'):
-            response['visualization'] = insights['visualization']
-        
-        return jsonify(response), 200
-        
-    except Exception as e:
-        logger.error(f"API analyze error: {e}", exc_info=True)
-        return jsonify({'error': str(e)}), 500
+    return orjson_response(
+        {'task_id': task_id, 'status': 'failed',
+         'error': record.get('error', 'Unknown error')},
+        record.get('http_status', 500)
+    )
 
 
 @api_blueprint.route('/query', methods=['POST'])
@@ -262,122 +642,48 @@ def query_endpoint():
     Response: Same as /analyze
     """
     try:
-        data = request.get_json()
+        data = get_request_json()
         session_id = data.get('session_id')
         query = data.get('query', '')
         
         if not session_id or session_id not in sessions:
-            return jsonify({'error': 'Invalid session_id'}), 400
+            return orjson_response({'error': 'Invalid session_id'}, 400)
         
         if not query:
-            return jsonify({'error': 'Query is required'}), 400
+            return orjson_response({'error': 'Query is required'}, 400)
         
         # Get session data
         session = sessions[session_id]
         if not session.get('dataset'):
-            return jsonify({'error': 'No dataset loaded in session'}), 400
+            return orjson_response({'error': 'No dataset loaded in session'}, 400)
         
-        # Load processed data
+        # Load processed data (cached per path+mtime, so repeat queries in a
+        # session skip the disk read and re-parse)
         processed_path = session['dataset']['processed_path']
-        df = services['file_handler'].load_file(processed_path)
-        
-        # Run full pipeline (same as analyze)
-        intent_result = services['intent_detector'].detect_intent(
-            query, 
-            df,
-            session.get('messages', [])
-        )
-        
-        dataset_context = f"{len(df)} rows, {len(df.columns)} columns"
-        refinement = services['query_refiner'].refine_query(query, intent_result, dataset_context)
-        query_to_use = refinement.get('refined_query', query) if refinement.get('refinement_applied') else query
-        
-        execution_plan = services['query_planner'].create_plan(
-            query_to_use,
-            intent_result,
-            {'row_count': len(df), 'columns': df.columns.tolist()}
-        )
-        
-        df_dtypes = {col: str(dtype) for col, dtype in df.dtypes.items()}
-        code_result = services['code_generator'].generate_code(
-            query_to_use,
-            intent_result,
-            execution_plan,
-            df.columns.tolist(),
-            df_dtypes
-        )
-        
-        validation_result = services['code_validator'].validate(
-            code_result['code'],
-            df.columns.tolist()
-        )
-        
-        if not validation_result['valid']:
-            return jsonify({
-                'error': 'Code validation failed',
-                'details': validation_result.get('errors', [])
-            }), 500
-        
-        execution_result = services['safe_executor'].execute(code_result['code'], df)
-        
-        if not execution_result['success']:
-            return jsonify({
-                'error': 'Execution failed',
-                'details': execution_result.get('error', 'Unknown error')
-            }), 500
-        
-        insights = services['insight_generator'].generate_insights(
-            execution_result['result'],
-            query_to_use,
-            execution_result.get('execution_time', 0)
-        )
-        
-        query_context = {
-            'refined_query': query_to_use if refinement.get('refinement_applied') else None,
-            'execution_time': execution_result.get('execution_time', 0)
-        }
-        answer = services['answer_synthesizer'].synthesize_answer(
-            query_to_use,
-            execution_result['result'],
-            query_context
-        )
-        
-        response = {
-            'success': True,
-            'status': 'completed',
-            'session_id': session_id,
-            'query': {
-                'original': query,
-                'refined': query_to_use if refinement.get('refinement_applied') else None,
-                'intent': {
-                    'type': intent_result.get('query_type'),
-                    'explanation': intent_result.get('explanation')
-                }
-            },
-            'code': {
-                'generated': code_result['code'],
-                'language': 'python',
-                'explanation': code_result.get('explanation', ''),
-                'execution_time': execution_result.get('execution_time', 0)
-            },
-            'result': {
-                'data': serialize_result(execution_result['result']),
-                'type': str(type(execution_result['result']).__name__)
-            },
-            'visualization': insights.get('visualization'),
-            'insights': {
-                'narrative': insights.get('narrative', ''),
-                'key_findings': insights.get('key_findings', []),
-                'recommendations': insights.get('recommendations', [])
-            },
-            'answer': answer
-        }
-        
-        return jsonify(response), 200
+        df = load_session_dataframe(processed_path)
+        
+        # Stream large DataFrame results as NDJSON when the client asks:
+        # run only up to execution, skipping insights/answer synthesis
+        if wants_stream():
+            (intent_result, refinement, query_to_use, execution_plan,
+             code_result, validation_result) = run_query_pipeline(
+                query, df, session.get('messages', [])
+            )
+            if validation_result['valid']:
+                execution_result = services['safe_executor'].execute(code_result['code'], df)
+                if (execution_result['success']
+                        and isinstance(execution_result['result'], pd.DataFrame)):
+                    return ndjson_stream(execution_result['result'])
+        
+        # Shared pipeline (same as analyze, LRU-cached on query + dataset)
+        payload, status = run_full_pipeline(df, query, session.get('messages', []))
+        if status == 200:
+            payload['session_id'] = session_id
+        return orjson_response(payload, status)
         
     except Exception as e:
-        logger.error(f"API query error: {e}", exc_info=True)
-        return jsonify({'error': str(e)}), 500
+        logger.error("API query error: %s", e, exc_info=True)
+        return orjson_response({'error': str(e)}, 500)
 
 
 @api_blueprint.route('/status/<session_id>', methods=['GET'])
@@ -400,7 +706,7 @@ def get_status(session_id):
         }
     """
     if session_id not in sessions:
-        return jsonify({'error': 'Session not found'}), 404
+        return orjson_response({'error': 'Session not found'}, 404)
     
     session = sessions[session_id]
     
@@ -422,7 +728,7 @@ def get_status(session_id):
             'column_names': ds.get('columns', [])
         }
     
-    return jsonify(response), 200
+    return orjson_response(response, 200)
 
 
 @api_blueprint.route('/code/validate', methods=['POST'])
@@ -444,20 +750,20 @@ def validate_code():
         }
     """
     try:
-        data = request.get_json()
+        data = get_request_json()
         code = data.get('code', '')
         columns = data.get('columns', [])
         
         if not code:
-            return jsonify({'error': 'Code is required'}), 400
+            return orjson_response({'error': 'Code is required'}, 400)
         
         validation_result = services['code_validator'].validate(code, columns)
         
-        return jsonify(validation_result), 200
+        return orjson_response(validation_result, 200)
         
     except Exception as e:
-        logger.error(f"Code validation error: {e}", exc_info=True)
-        return jsonify({'error': str(e)}), 500
+        logger.error("Code validation error: %s", e, exc_info=True)
+        return orjson_response({'error': str(e)}, 500)
 
 
 @api_blueprint.route('/code/execute', methods=['POST'])
@@ -479,47 +785,152 @@ def execute_code():
         }
     """
     try:
-        data = request.get_json()
+        data = get_request_json()
         session_id = data.get('session_id')
         code = data.get('code', '')
         
         if not session_id or session_id not in sessions:
-            return jsonify({'error': 'Invalid session_id'}), 400
+            return orjson_response({'error': 'Invalid session_id'}, 400)
         
         if not code:
-            return jsonify({'error': 'Code is required'}), 400
+            return orjson_response({'error': 'Code is required'}, 400)
         
         session = sessions[session_id]
         if not session.get('dataset'):
-            return jsonify({'error': 'No dataset loaded'}), 400
+            return orjson_response({'error': 'No dataset loaded'}, 400)
         
-        # Load data
+        # Load data (cached per path+mtime)
         processed_path = session['dataset']['processed_path']
-        df = services['file_handler'].load_file(processed_path)
+        df = load_session_dataframe(processed_path)
         
         # Validate first
-        validation_result = services['code_validator'].validate(code, df.columns.tolist())
+        validation_result = services['code_validator'].validate(code, frame_columns(df))
         if not validation_result['valid']:
-            return jsonify({
+            return orjson_response({
                 'error': 'Code validation failed',
                 'details': validation_result
-            }), 400
+            }, 400)
         
         # Execute
         execution_result = services['safe_executor'].execute(code, df)
         
         if not execution_result['success']:
-            return jsonify({
+            return orjson_response({
                 'success': False,
                 'error': execution_result.get('error', 'Execution failed')
-            }), 500
+            }, 500)
+        
+        if wants_stream() and isinstance(execution_result['result'], pd.DataFrame):
+            return ndjson_stream(execution_result['result'])
         
-        return jsonify({
+        return orjson_response({
             'success': True,
             'result': serialize_result(execution_result['result']),
             'execution_time': execution_result.get('execution_time', 0)
-        }), 200
+        })
+        
+    except Exception as e:
+        logger.error("Code execution error: %s", e, exc_info=True)
+        return orjson_response({'error': str(e)}, 500)
+
+
+@api_blueprint.route('/batch', methods=['POST'])
+def batch_queries():
+    """
+    Run multiple queries against one session's dataset in a single call
+    
+    The DataFrame is loaded once and shared across all queries, and the
+    queries run concurrently on a small thread pool while sharing the
+    intent/plan cache - dashboards issuing N follow-up questions no longer
+    pay N file loads and N HTTP round-trips.
+    
+    Request:
+        {
+            "session_id": "uuid",
+            "queries": ["top 5 stocks", "average volume", ...]
+        }
+    
+    Response:
+        {
+            "success": true,
+            "results": [{"query": "...", "status": 200, ...}, ...],
+            "partial_failures": [indexes of failed queries]
+        }
+    """
+    try:
+        data = get_request_json()
+        session_id = data.get('session_id')
+        queries = data.get('queries', [])
+        
+        if not session_id or session_id not in sessions:
+            return orjson_response({'error': 'Invalid session_id'}, 400)
+        
+        if not queries or not isinstance(queries, list):
+            return orjson_response({'error': 'queries must be a non-empty list'}, 400)
+        
+        session = sessions[session_id]
+        if not session.get('dataset'):
+            return orjson_response({'error': 'No dataset loaded in session'}, 400)
+        
+        # One load shared by every query in the batch
+        processed_path = session['dataset']['processed_path']
+        df = load_session_dataframe(processed_path)
+        
+        def run_one(query):
+            """Full pipeline for a single query; returns an item dict"""
+            try:
+                (intent_result, refinement, query_to_use, execution_plan,
+                 code_result, validation_result) = run_query_pipeline(query, df)
+                
+                if not validation_result['valid']:
+                    return {
+                        'query': query,
+                        'status': 500,
+                        'error': 'Code validation failed',
+                        'details': validation_result.get('errors', [])
+                    }
+                
+                execution_result = services['safe_executor'].execute(code_result['code'], df)
+                
+                if not execution_result['success']:
+                    return {
+                        'query': query,
+                        'status': 500,
+                        'error': 'Execution failed',
+                        'details': execution_result.get('error', 'Unknown error')
+                    }
+                
+                return {
+                    'query': query,
+                    'status': 200,
+                    'refined': query_to_use if refinement.get('refinement_applied') else None,
+                    'intent': {
+                        'type': intent_result.get('query_type'),
+                        'explanation': intent_result.get('explanation')
+                    },
+                    'code': code_result['code'],
+                    'result': {
+                        'data': serialize_result(execution_result['result']),
+                        'type': str(type(execution_result['result']).__name__)
+                    },
+                    'execution_time': execution_result.get('execution_time', 0)
+                }
+            except Exception as e:
+                logger.error("Batch item failed for query '%s': %s", query, e, exc_info=True)
+                return {'query': query, 'status': 500, 'error': str(e)}
+        
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=min(len(queries), 8)) as pool:
+            results = list(pool.map(run_one, queries))
+        
+        partial_failures = [i for i, item in enumerate(results) if item['status'] != 200]
+        
+        return orjson_response({
+            'success': len(partial_failures) < len(results),
+            'results': results,
+            'partial_failures': partial_failures
+        })
         
     except Exception as e:
-        logger.error(f"Code execution error: {e}", exc_info=True)
-        return jsonify({'error': str(e)}), 500
+        logger.error("API batch error: %s", e, exc_info=True)
+        return orjson_response({'error': str(e)}, 500)
@@ -1,8 +1,11 @@
 """
 Configuration settings for NLytics
 """
+import logging
 import os
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
+from queue import Queue
 
 # Base directory
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -24,6 +27,10 @@ MAX_RETRIES = 3
 # Model settings
 GROQ_API_KEY = os.environ.get('GROQ_API_KEY', '')
 
+# Execution backend: 'pandas' (default) or 'polars' (multi-threaded
+# columnar engine for translatable queries; requires the polars package)
+DATAFRAME_BACKEND = os.environ.get('DATAFRAME_BACKEND', 'pandas')
+
 # Session settings
 SESSION_TIMEOUT = 3600  # 1 hour
 
@@ -31,3 +38,51 @@ SESSION_TIMEOUT = 3600  # 1 hour
 MAX_ROWS = 1_000_000
 MAX_COLUMNS = 500
 EXECUTION_TIMEOUT = 300  # 5 minutes
+
+# Logging
+LOG_FORMAT = '%(asctime)s [%(levelname)s] %(message)s'
+_log_listener = None
+
+
+def configure_logging(level=logging.INFO):
+    """
+    Route log records through a queue so handler I/O happens off the
+    request thread
+
+    Handlers write to stderr from a background QueueListener thread;
+    emitting a record on the hot path is just a queue put. Safe to call
+    more than once.
+    """
+    global _log_listener
+    if _log_listener is not None:
+        return
+
+    log_queue = Queue(-1)
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.addHandler(QueueHandler(log_queue))
+
+    _log_listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _log_listener.start()
+
+
+def restart_log_listener():
+    """
+    Start a fresh listener for the current process after a fork
+
+    Under gunicorn's preload_app the listener thread starts in the master
+    at import time and does not survive fork: workers inherit the queue
+    handler (records keep getting enqueued) but nothing drains the queue,
+    so it grows without bound and nothing is ever written. Called from
+    the post_fork hook so each worker drains its own copy of the queue.
+    """
+    global _log_listener
+    if _log_listener is None:
+        return
+    _log_listener = QueueListener(
+        _log_listener.queue, *_log_listener.handlers, respect_handler_level=True
+    )
+    _log_listener.start()
@@ -0,0 +1,33 @@
+"""
+Gunicorn Configuration
+Production server settings for the NLytics backend
+"""
+bind = "0.0.0.0:5000"
+workers = 4
+timeout = 120
+keepalive = 5
+
+# Chat requests spend most wall time blocked on Groq/network I/O, so
+# cooperative gevent workers multiplex many in-flight requests per
+# process (main.py monkey-patches before the stack is imported)
+try:
+    import gevent  # noqa: F401
+    worker_class = "gevent"
+    worker_connections = 500
+except ImportError:
+    worker_class = "sync"
+
+# Import the app (pandas/numpy, service singletons, compiled regexes)
+# once in the master before forking: the ~100MB of module state is
+# shared copy-on-write across all workers instead of duplicated per
+# fork, and reloads pay the import cost once
+preload_app = True
+
+
+def post_fork(server, worker):
+    # The logging QueueListener thread started during the preloaded
+    # import belongs to the master and does not survive fork; each
+    # worker restarts its own so log records actually get written
+    # instead of piling up in an undrained queue
+    from config import restart_log_listener
+    restart_log_listener()
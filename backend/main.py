@@ -2,22 +2,57 @@
 NLytics Backend - Main Application
 Lightweight Flask server with chat-first interface
 """
-from flask import Flask, render_template, request, jsonify
+# Monkey-patch before anything imports socket/ssl (groq, requests):
+# with gevent workers each process multiplexes hundreds of in-flight
+# Groq/network waits instead of pinning one request per worker. No-op
+# when gevent isn't installed - sync workers behave as before.
+try:
+    from gevent import monkey
+    monkey.patch_all()
+except ImportError:
+    pass
+
+from flask import Flask, render_template, request, Response
 from flask_cors import CORS
+from flask_compress import Compress
 from werkzeug.utils import secure_filename
 import os
+import pickle
 import uuid
 import numpy as np
+import orjson
 import pandas as pd
-import json
 import logging
 from datetime import datetime, timezone
 from dotenv import load_dotenv
 from pathlib import Path
 from typing import Dict, Any
+from collections import OrderedDict, namedtuple
+from contextlib import contextmanager
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import redis
+    import msgpack
+except ImportError:  # optional - only needed for SESSION_BACKEND=redis
+    redis = None
+    msgpack = None
+
+try:
+    from filelock import FileLock
+except ImportError:  # optional - session edits fall back to an in-process lock
+    FileLock = None
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(message)s')
+try:
+    from streaming_form_data import StreamingFormDataParser
+    from streaming_form_data.targets import FileTarget, ValueTarget
+except ImportError:  # optional - uploads fall back to werkzeug's parser
+    StreamingFormDataParser = None
+
+# Configure logging (queue-backed: handler I/O runs off the request thread)
+from config import configure_logging, UPLOAD_FOLDER, PROCESSED_FOLDER
+configure_logging()
 logger = logging.getLogger(__name__)
 
 # Load environment variables from .env file (in parent directory)
@@ -84,23 +119,9 @@ def handle_error(session_id: str, error: Exception, context: str = "") -> Dict[s
     return error_chat_msg.to_dict()
 
 
-class NumpyEncoder(json.JSONEncoder):
-    """Custom JSON encoder to handle NumPy types"""
-    def default(self, obj):
-        if isinstance(obj, (np.integer, np.int64, np.int32)):
-            return int(obj)
-        elif isinstance(obj, (np.floating, np.float64, np.float32)):
-            return float(obj)
-        elif isinstance(obj, np.ndarray):
-            return obj.tolist()
-        elif isinstance(obj, np.bool_):
-            return bool(obj)
-        return super().default(obj)
-
 app = Flask(__name__, 
             template_folder='../frontend',
             static_folder='../frontend/static')
-app.json.encoder = NumpyEncoder  # Use custom encoder for NumPy types
 
 # Configure CORS to allow requests from Render deployment
 CORS(app, resources={
@@ -112,10 +133,28 @@ CORS(app, resources={
     }
 })
 
+# Compress responses on the wire - analyze/query payloads are JSON with
+# heavily repeated key/column strings, so they shrink 5-20x. zstd is
+# preferred (fast decompression), falling back to brotli then gzip.
+app.config['COMPRESS_ALGORITHM'] = ['zstd', 'br', 'gzip']
+app.config['COMPRESS_ZSTD_LEVEL'] = 3
+app.config['COMPRESS_MIN_SIZE'] = 512  # tiny bodies cost more to encode than to send
+app.config['COMPRESS_MIMETYPES'] = [
+    'application/json', 'application/x-ndjson',
+    'text/html', 'text/css', 'application/javascript'
+]
+Compress(app)
+
+# Compact output for anything still going through Flask's own JSON
+# provider (error handlers, extensions) - no indent/key-sort pass and
+# no whitespace bytes on the wire. Flask 3 equivalent of the old
+# JSONIFY_PRETTYPRINT_REGULAR=False.
+app.json.compact = True
+
 # Configuration
 app.config['MAX_CONTENT_LENGTH'] = 50 * 1024 * 1024  # 50MB limit
-app.config['UPLOAD_FOLDER'] = os.path.join(os.path.dirname(__file__), '..', 'data', 'uploads')
-app.config['PROCESSED_FOLDER'] = os.path.join(os.path.dirname(__file__), '..', 'data', 'processed')
+app.config['UPLOAD_FOLDER'] = str(UPLOAD_FOLDER)
+app.config['PROCESSED_FOLDER'] = str(PROCESSED_FOLDER)
 ALLOWED_EXTENSIONS = {'csv', 'xlsx', 'xls'}
 
 # Session storage folder
@@ -143,34 +182,219 @@ answer_synthesizer = AnswerSynthesizer()
 # File-based session store (works across multiple Gunicorn workers)
 class FileSessionStore:
     """Thread-safe file-based session storage for multi-worker deployments"""
+
+    # Per-worker read cache size; entries are small (metadata + message
+    # dicts) so this is a few MB at most
+    CACHE_MAX_ENTRIES = 128
+
     def __init__(self, storage_dir):
         self.storage_dir = storage_dir
         os.makedirs(storage_dir, exist_ok=True)
-    
+        # mtime-validated LRU: repeated reads of the same session within
+        # (or across) requests skip the disk read and JSON decode. The
+        # stamp covers both the main file and the message side log, so a
+        # write from any worker invalidates via the changed mtime.
+        self._cache = OrderedDict()
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+        # Session-ID index built once at startup: membership checks and
+        # keys() stop touching the directory
+        self._ids = {
+            entry.name.rsplit('.', 1)[0]
+            for entry in os.scandir(storage_dir)
+            if entry.name.endswith('.pkl')
+            or (entry.name.endswith('.json') and not entry.name.endswith('.meta.json'))
+        }
+
+    def _session_lock(self, session_id):
+        with self._locks_guard:
+            lock = self._locks.get(session_id)
+            if lock is None:
+                if FileLock is not None:
+                    # Sidecar lock file: exclusive across Gunicorn workers
+                    lock = FileLock(self._get_session_path(session_id) + '.lock')
+                else:
+                    lock = threading.Lock()
+                self._locks[session_id] = lock
+            return lock
+
+    @contextmanager
+    def edit(self, session_id):
+        """Exclusive read-modify-write cycle on one session
+
+        Concurrent requests to the same session otherwise interleave
+        load/mutate/store and clobber each other's updates. Message
+        appends don't need this - the side log's O_APPEND writes are
+        already atomic.
+        """
+        with self._session_lock(session_id):
+            data = self[session_id]
+            yield data
+            self[session_id] = data
+
+    def _stamp(self, session_id):
+        stamp = os.stat(self._get_session_path(session_id)).st_mtime_ns
+        try:
+            log_stat = os.stat(self._get_messages_path(session_id))
+            return (stamp, log_stat.st_mtime_ns, log_stat.st_size)
+        except FileNotFoundError:
+            return (stamp, 0, 0)
+
+    def _cache_put(self, session_id, stamp, value):
+        self._cache[session_id] = (stamp, value)
+        self._cache.move_to_end(session_id)
+        if len(self._cache) > self.CACHE_MAX_ENTRIES:
+            self._cache.popitem(last=False)
+
+    @staticmethod
+    def _copy_out(value):
+        # Callers mutate the returned dict (append messages, attach a
+        # dataset), so hand out a shallow copy with its own messages list
+        copied = dict(value)
+        copied['messages'] = list(value.get('messages', []))
+        return copied
+
     def _get_session_path(self, session_id):
-        return os.path.join(self.storage_dir, f"{session_id}.json")
-    
+        return os.path.join(self.storage_dir, f"{session_id}.pkl")
+
+    def _get_meta_path(self, session_id):
+        return os.path.join(self.storage_dir, f"{session_id}.meta.json")
+
+    def _get_messages_path(self, session_id):
+        return os.path.join(self.storage_dir, f"{session_id}.jsonl")
+
+
     def __contains__(self, session_id):
-        return os.path.exists(self._get_session_path(session_id))
+        if session_id in self._ids:
+            return True
+        # Another worker may have created the session since startup;
+        # fall back to a stat (plus the legacy name) and remember the answer
+        if (os.path.exists(self._get_session_path(session_id))
+                or os.path.exists(os.path.join(self.storage_dir, f"{session_id}.json"))):
+            self._ids.add(session_id)
+            return True
+        return False
     
     def __getitem__(self, session_id):
+        # No separate existence check: the stat in _stamp doubles as it,
+        # so a hit costs one syscall instead of two
         path = self._get_session_path(session_id)
-        if not os.path.exists(path):
-            raise KeyError(f"Session {session_id} not found")
         try:
-            with open(path, 'r') as f:
-                return json.load(f)
+            stamp = self._stamp(session_id)
+            cached = self._cache.get(session_id)
+            if cached is not None and cached[0] == stamp:
+                self._cache.move_to_end(session_id)
+                return self._copy_out(cached[1])
+            with open(path, 'rb') as f:
+                data = pickle.loads(f.read())
+            self._merge_side_log(session_id, data)
+            self._cache_put(session_id, stamp, data)
+            return self._copy_out(data)
+        except FileNotFoundError:
+            return self._load_legacy(session_id)
         except Exception as e:
             logger.error(f"Error loading session {session_id}: {e}")
             raise KeyError(f"Session {session_id} corrupted")
-    
+
+    def _merge_side_log(self, session_id, data):
+        # Merge messages appended to the side log since the last full
+        # rewrite (see append_message)
+        messages_path = self._get_messages_path(session_id)
+        if os.path.exists(messages_path):
+            with open(messages_path, 'rb') as f:
+                data['messages'].extend(
+                    orjson.loads(line) for line in f.read().splitlines() if line
+                )
+
+    def _load_legacy(self, session_id):
+        # Sessions written as plain JSON before the pickle format; they
+        # get rewritten as .pkl on their next full save
+        legacy_path = os.path.join(self.storage_dir, f"{session_id}.json")
+        try:
+            with open(legacy_path, 'rb') as f:
+                data = orjson.loads(f.read())
+        except FileNotFoundError:
+            raise KeyError(f"Session {session_id} not found")
+        self._merge_side_log(session_id, data)
+        return data
+
     def __setitem__(self, session_id, value):
         path = self._get_session_path(session_id)
         try:
-            with open(path, 'w') as f:
-                json.dump(value, f)
+            # Sessions are server-internal, so pickle protocol 5 skips
+            # JSON encoding entirely (several times faster for nested
+            # Python structures and lossless for numpy). Write to a temp
+            # file and rename so a crashed worker never leaves a
+            # half-written (unparseable) session behind.
+            data = pickle.dumps(value, protocol=5)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+            # A full write folds any side-logged messages into the main
+            # file, so the append log starts fresh
+            messages_path = self._get_messages_path(session_id)
+            if os.path.exists(messages_path):
+                os.remove(messages_path)
+            self._cache_put(session_id, self._stamp(session_id), self._copy_out(value))
+            self._ids.add(session_id)
+            # Tiny human-readable sidecar so sessions can be inspected
+            # (ls / cat) without unpickling
+            with open(self._get_meta_path(session_id), 'wb') as f:
+                f.write(orjson.dumps({
+                    'id': value.get('id'),
+                    'created_at': value.get('created_at'),
+                    'dataset': (value.get('dataset') or {}).get('filename'),
+                    'message_count': len(value.get('messages', []))
+                }))
         except Exception as e:
             logger.error(f"Error saving session {session_id}: {e}")
+
+    def append_message(self, session_id, msg_dict):
+        """Append one message without rewriting the whole session
+
+        Rewriting the full session per message is O(N^2) bytes over a
+        conversation; a single appended JSONL line keeps it O(N).
+        """
+        try:
+            with open(self._get_messages_path(session_id), 'ab') as f:
+                f.write(orjson.dumps(
+                    msg_dict,
+                    option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NAIVE_UTC
+                ) + b'\n')
+        except Exception as e:
+            logger.error(f"Error appending message to session {session_id}: {e}")
+
+    def raw_messages(self, session_id):
+        """Messages as a list of serialized JSON blobs, or None if absent
+
+        Side-logged messages are returned as the exact line bytes they
+        were written with - no decode/re-encode round-trip - so callers
+        can splice them straight into a response body.
+        """
+        try:
+            with open(self._get_session_path(session_id), 'rb') as f:
+                base_messages = pickle.loads(f.read()).get('messages', [])
+        except FileNotFoundError:
+            # Legacy plain-JSON session: read it directly instead of via
+            # _load_legacy, which would decode the side log only for the
+            # splice below to re-encode it; both formats then share the
+            # same raw-line splice
+            legacy_path = os.path.join(self.storage_dir, f"{session_id}.json")
+            try:
+                with open(legacy_path, 'rb') as f:
+                    base_messages = orjson.loads(f.read()).get('messages', [])
+            except FileNotFoundError:
+                return None
+        except Exception as e:
+            logger.error(f"Error loading session {session_id}: {e}")
+            return None
+        blobs = [orjson.dumps(m, option=orjson.OPT_SERIALIZE_NUMPY) for m in base_messages]
+        messages_path = self._get_messages_path(session_id)
+        if os.path.exists(messages_path):
+            with open(messages_path, 'rb') as f:
+                blobs.extend(line for line in f.read().splitlines() if line)
+        return blobs
     
     def get(self, session_id, default=None):
         try:
@@ -178,15 +402,158 @@ class FileSessionStore:
         except KeyError:
             return default
     
+    def pop(self, session_id, default=None):
+        """Remove a session and return its data (default when absent)"""
+        with self._session_lock(session_id):
+            try:
+                data = self[session_id]
+            except KeyError:
+                return default
+            self._cache.pop(session_id, None)
+            self._ids.discard(session_id)
+            for path in (self._get_session_path(session_id),
+                         self._get_meta_path(session_id),
+                         self._get_messages_path(session_id)):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+            return data
+    
+    def keys(self):
+        return list(self._ids)
+
+class RedisSessionStore:
+    """Redis-backed session storage with msgpack values
+
+    Shares state across workers and hosts; msgpack encodes/decodes
+    several times faster than JSON and produces smaller blobs. Entries
+    expire after SESSION_TIMEOUT seconds of inactivity.
+    """
+    SESSION_TIMEOUT = 3600  # 1 hour, matches config.SESSION_TIMEOUT
+
+    def __init__(self, url):
+        self.client = redis.Redis.from_url(url, max_connections=64)
+
+    def _key(self, session_id):
+        return f"sess:{session_id}"
+
+    def _messages_key(self, session_id):
+        return f"sess:{session_id}:messages"
+
+    def __contains__(self, session_id):
+        return bool(self.client.exists(self._key(session_id)))
+
+    def __getitem__(self, session_id):
+        blob = self.client.get(self._key(session_id))
+        if blob is None:
+            raise KeyError(f"Session {session_id} not found")
+        data = msgpack.unpackb(blob, raw=False)
+        # Merge messages appended to the side list since the last full
+        # rewrite (see append_message)
+        appended = self.client.lrange(self._messages_key(session_id), 0, -1)
+        if appended:
+            data['messages'].extend(msgpack.unpackb(m, raw=False) for m in appended)
+        return data
+
+    def __setitem__(self, session_id, value):
+        try:
+            # A full write folds side-listed messages into the main blob,
+            # so the list is cleared in the same pipelined round-trip
+            pipe = self.client.pipeline()
+            pipe.setex(
+                self._key(session_id),
+                self.SESSION_TIMEOUT,
+                msgpack.packb(value, use_bin_type=True)
+            )
+            pipe.delete(self._messages_key(session_id))
+            pipe.execute()
+        except Exception as e:
+            logger.error("Error saving session %s: %s", session_id, e)
+
+    def append_message(self, session_id, msg_dict):
+        """Append one message without rewriting the whole session
+
+        RPUSH is O(1) on the server and a single pipelined round-trip
+        here, versus get + unpack + pack + setex of the growing blob.
+        """
+        try:
+            pipe = self.client.pipeline()
+            key = self._messages_key(session_id)
+            pipe.rpush(key, msgpack.packb(msg_dict, use_bin_type=True))
+            pipe.expire(key, self.SESSION_TIMEOUT)
+            pipe.execute()
+        except Exception as e:
+            logger.error("Error appending message to session %s: %s", session_id, e)
+
+    def get(self, session_id, default=None):
+        try:
+            return self[session_id]
+        except KeyError:
+            return default
+
+    def pop(self, session_id, default=None):
+        """Remove a session and return its data (default when absent)"""
+        try:
+            data = self[session_id]
+        except KeyError:
+            return default
+        self.client.delete(self._key(session_id), self._messages_key(session_id))
+        return data
+
     def keys(self):
-        return [f.replace('.json', '') for f in os.listdir(self.storage_dir) if f.endswith('.json')]
+        # The message side lists live under sess:<id>:messages and must
+        # not surface as phantom session ids
+        prefix_len = len("sess:")
+        return [
+            k.decode()[prefix_len:]
+            for k in self.client.scan_iter("sess:*")
+            if not k.endswith(b":messages")
+        ]
+
+    @contextmanager
+    def edit(self, session_id):
+        """Read-modify-write cycle; matches FileSessionStore.edit"""
+        data = self[session_id]
+        yield data
+        self[session_id] = data
+
+
+# SESSION_BACKEND=redis shares sessions across hosts (requires redis +
+# msgpack and a REDIS_URL); the file store remains the default and needs
+# no extra infrastructure
+if os.environ.get('SESSION_BACKEND') == 'redis' and redis is not None:
+    sessions = RedisSessionStore(os.environ.get('REDIS_URL', 'redis://localhost:6379/0'))
+else:
+    sessions = FileSessionStore(SESSION_FOLDER)
+
+
+# Single worker keeps persisted messages strictly FIFO while moving the
+# disk write off the request thread
+_SESSION_IO_POOL = ThreadPoolExecutor(max_workers=1)
 
-sessions = FileSessionStore(SESSION_FOLDER)
+# Runs answer synthesis concurrently with insight generation; both are
+# dominated by network/LLM latency, so threads overlap them fully
+_SYNTHESIS_POOL = ThreadPoolExecutor(max_workers=4)
+
+
+def save_message_async(session_id: str, message: ChatMessage):
+    """Persist a chat message without blocking the response
+
+    The client only needs the in-memory dict; the session-log append can
+    overlap with sending the HTTP response.
+    """
+    _SESSION_IO_POOL.submit(save_message_to_session, session_id, message)
 
 
 def save_message_to_session(session_id: str, message: ChatMessage):
     """Helper to append message and save session atomically"""
-    if session_id in sessions:
+    if session_id not in sessions:
+        return
+    if hasattr(sessions, 'append_message'):
+        # File store: one appended line instead of rewriting the session
+        sessions.append_message(session_id, message.to_dict())
+    else:
         session_data = sessions[session_id]
         session_data['messages'].append(message.to_dict())
         sessions[session_id] = session_data
@@ -212,25 +579,70 @@ init_api(service_dict, sessions)
 app.register_blueprint(api_blueprint)
 
 
-def convert_numpy_types(obj):
-    """Recursively convert NumPy types to native Python types"""
-    if isinstance(obj, dict):
-        return {key: convert_numpy_types(value) for key, value in obj.items()}
-    elif isinstance(obj, list):
-        return [convert_numpy_types(item) for item in obj]
-    elif isinstance(obj, (np.integer, np.int64, np.int32)):
-        return int(obj)
-    elif isinstance(obj, (np.floating, np.float64, np.float32)):
-        return float(obj)
-    elif isinstance(obj, np.ndarray):
-        return obj.tolist()
-    elif isinstance(obj, np.bool_):
-        return bool(obj)
-    return obj
+# Per-worker processed-dataframe cache: successive chat turns on the
+# same dataset skip even the parquet read. Keyed on mtime so a rewritten
+# working copy is picked up automatically.
+_DF_CACHE = OrderedDict()
+_DF_CACHE_MAX = 8
+
+# Flat schema facts extracted once per load so callers never walk
+# df.columns/df.dtypes per request
+DatasetSchema = namedtuple('DatasetSchema', ['columns', 'dtypes', 'row_count'])
+
+
+def load_processed_df(processed_path, file_id):
+    """Load the processed dataframe and its schema, reusing cached copies"""
+    key = (file_id, os.stat(processed_path).st_mtime_ns)
+    entry = _DF_CACHE.get(key)
+    if entry is None:
+        df = file_handler.load_file(processed_path)
+        schema = DatasetSchema(
+            columns=df.columns.tolist(),
+            dtypes={col: str(dtype) for col, dtype in df.dtypes.items()},
+            row_count=len(df)
+        )
+        entry = (df, schema)
+        _DF_CACHE[key] = entry
+        if len(_DF_CACHE) > _DF_CACHE_MAX:
+            _DF_CACHE.popitem(last=False)
+    else:
+        _DF_CACHE.move_to_end(key)
+    return entry
+
+
+def to_native(obj):
+    """Convert numpy scalars/arrays in a nested structure to native types
+
+    One C-level orjson round-trip instead of a recursive Python tree
+    walk; only needed where the result is stored or handed to encoders
+    that don't understand numpy (e.g. msgpack).
+    """
+    return orjson.loads(orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY))
+
+
+def ojsonify(payload, status=200):
+    """jsonify drop-in that serializes with orjson's C encoder
+
+    Handles numpy scalars/arrays natively, so result/insight payloads
+    skip the pure-Python encoder entirely.
+    """
+    return Response(
+        orjson.dumps(
+            payload,
+            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS | orjson.OPT_NAIVE_UTC
+        ),
+        status=status,
+        mimetype='application/json'
+    )
+
+
+# Matches ALLOWED_EXTENSIONS; a single C-level endswith on a tuple beats
+# rsplit + list indexing + set lookup
+_ALLOWED_SUFFIXES = ('.csv', '.xlsx', '.xls')
 
 
 def allowed_file(filename):
-    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+    return filename.lower().endswith(_ALLOWED_SUFFIXES)
 
 
 @app.route('/')
@@ -271,80 +683,118 @@ def new_session():
     
     logger.info(f"Created new session: {session_id}")
     
-    return jsonify({
+    return ojsonify({
         'session_id': session_id,
         'message': welcome_msg.to_dict()
     })
 
 
+# Read size for the streaming multipart parser
+UPLOAD_STREAM_CHUNK = 64 * 1024
+
+
+def _receive_upload():
+    """Receive the upload body, returning (session_id, filename, staged_path)
+
+    With streaming-form-data installed, the multipart body is parsed
+    straight off request.stream into a temp file in 64KB chunks, never
+    buffering the upload through werkzeug's CPU-bound multipart parser.
+    Without it, werkzeug parses as before and the file part is staged to
+    the same temp location. staged_path is None when no file was sent.
+    """
+    staged_path = os.path.join(app.config['UPLOAD_FOLDER'], f".incoming_{uuid.uuid4()}.part")
+
+    if StreamingFormDataParser is not None:
+        file_target = FileTarget(staged_path)
+        session_target = ValueTarget()
+        parser = StreamingFormDataParser(headers=request.headers)
+        parser.register('file', file_target)
+        parser.register('session_id', session_target)
+        while True:
+            chunk = request.stream.read(UPLOAD_STREAM_CHUNK)
+            if not chunk:
+                break
+            parser.data_received(chunk)
+        session_id = session_target.value.decode('utf-8') if session_target.value else None
+        if not file_target.multipart_filename:
+            if os.path.exists(staged_path):
+                os.remove(staged_path)
+            return session_id, None, None
+        return session_id, file_target.multipart_filename, staged_path
+
+    session_id = request.form.get('session_id')
+    file = request.files.get('file')
+    if file is None or file.filename == '':
+        return session_id, None, None
+    file_handler.save_upload(file, staged_path)
+    return session_id, file.filename, staged_path
+
+
 @app.route('/api/upload', methods=['POST'])
 def upload_file():
     """Handle file upload and return initial schema inspection"""
-    # Log request details for debugging
-    logger.info(f"Upload request received - Content-Type: {request.content_type}")
-    logger.info(f"Form data keys: {list(request.form.keys())}")
-    logger.info(f"Files: {list(request.files.keys())}")
-    
-    session_id = request.form.get('session_id')
-    
+    logger.info("Upload request received - Content-Type: %s", request.content_type)
+
+    # Preflight on the declared body size: reject oversized uploads
+    # before spending any parsing or disk work on a doomed request
+    content_length = request.content_length
+    if content_length and content_length > app.config['MAX_CONTENT_LENGTH']:
+        logger.error(f"Upload rejected - body of {content_length} bytes exceeds limit")
+        return ojsonify({'error': 'File too large. Maximum upload size is 50MB.'}, 413)
+
+    session_id, orig_filename, staged_path = _receive_upload()
+
+    def reject(message, status=400):
+        if staged_path and os.path.exists(staged_path):
+            os.remove(staged_path)
+        return ojsonify({'error': message}, status)
+
     if not session_id:
         logger.error("No session_id in request")
-        return jsonify({'error': 'Missing session_id'}), 400
-    
+        return reject('Missing session_id')
+
     if session_id not in sessions:
         logger.error(f"Invalid session_id: {session_id}")
-        logger.info(f"Available sessions: {list(sessions.keys())}")
-        return jsonify({'error': 'Invalid or expired session. Please refresh the page.'}), 400
-    
-    if 'file' not in request.files:
-        logger.error("No file in request.files")
-        return jsonify({'error': 'No file provided'}), 400
-    
-    file = request.files['file']
-    
-    if file.filename == '':
-        logger.error("Empty filename")
-        return jsonify({'error': 'No file selected'}), 400
-    
-    if not allowed_file(file.filename):
-        logger.error(f"Invalid file type: {file.filename}")
-        return jsonify({'error': 'File type not supported. Please upload CSV or Excel files.'}), 400
-    
+        return reject('Invalid or expired session. Please refresh the page.')
+
+    if staged_path is None:
+        logger.error("No file in request")
+        return reject('No file provided')
+
+    if not allowed_file(orig_filename):
+        logger.error(f"Invalid file type: {orig_filename}")
+        return reject('File type not supported. Please upload CSV or Excel files.')
+
     try:
-        # Save and process file
-        filename = secure_filename(file.filename)
+        # The file is already on disk; just move it into place
+        filename = secure_filename(orig_filename)
         file_id = str(uuid.uuid4())
         file_path = os.path.join(app.config['UPLOAD_FOLDER'], f"{file_id}_{filename}")
-        file.save(file_path)
-        
+        os.replace(staged_path, file_path)
+        staged_path = None
+
         logger.info(f"File saved: {file_path}")
         
         # Load and inspect schema
         df = file_handler.load_file(file_path)
-        schema_info = convert_numpy_types(schema_inspector.inspect(df, filename))
+        # The inspector normalizes to native types at the source (int(),
+        # float(), isoformat strings), so its output needs no extra pass
+        schema_info = schema_inspector.inspect(df, filename)
         
         # Phase 2: Preprocess the data
         cleaned_df, preprocessing_manifest = preprocessor.preprocess(df, filename)
-        preprocessing_manifest = convert_numpy_types(preprocessing_manifest)
+        # Manifest is persisted and embedded in message metadata, so pin
+        # it to native types with one C-level round-trip
+        preprocessing_manifest = to_native(preprocessing_manifest)
         
-        # Save cleaned data
-        processed_path = os.path.join(app.config['PROCESSED_FOLDER'], f"{file_id}_{filename}")
-        if filename.endswith('.csv'):
-            cleaned_df.to_csv(processed_path, index=False)
-        else:
-            cleaned_df.to_excel(processed_path, index=False)
-        
-        # Load session and update it
-        session_data = sessions[session_id]
-        session_data['dataset'] = {
-            'file_id': file_id,
-            'filename': filename,
-            'file_path': file_path,
-            'processed_path': processed_path,
-            'schema': schema_info,
-            'preprocessing_manifest': preprocessing_manifest
-        }
+        # Save cleaned data (Parquet preferred - reloads are memory-mapped
+        # instead of re-parsing CSV/Excel on every query)
+        processed_path = file_handler.save_processed(
+            cleaned_df, app.config['PROCESSED_FOLDER'], file_id, filename
+        )
         
+        # Update the session under its lock so a concurrent request
+        # can't clobber the dataset/messages update
         # Create upload confirmation message
         upload_msg = ChatMessage(
             type=MessageType.SYSTEM,
@@ -359,8 +809,6 @@ def upload_file():
                 }
             }
         )
-        session_data['messages'].append(upload_msg.to_dict())
-        
         # Create health report message
         health_report = preprocessor.generate_health_report(preprocessing_manifest)
         health_msg = ChatMessage(
@@ -372,14 +820,35 @@ def upload_file():
                 'manifest': preprocessing_manifest
             }
         )
-        session_data['messages'].append(health_msg.to_dict())
-        
-        # Save updated session
-        sessions[session_id] = session_data
-        
+
+        # Update the session under its lock so a concurrent request can't
+        # clobber the dataset/messages update
+        with sessions.edit(session_id) as session_data:
+            session_data['dataset'] = {
+                'file_id': file_id,
+                'filename': filename,
+                'file_path': file_path,
+                'processed_path': processed_path,
+                'schema': schema_info,
+                'preprocessing_manifest': preprocessing_manifest,
+                # Immutable per-dataset facts, precomputed so chat turns
+                # don't rebuild them from the dataframe every time
+                'columns': cleaned_df.columns.tolist(),
+                'dtypes': {col: str(dtype) for col, dtype in cleaned_df.dtypes.items()},
+                'row_count': len(cleaned_df),
+                # Numeric stats the intent detector needs for its dataset
+                # context, paid once here instead of on the first chat turn
+                'stats': to_native({
+                    col: cleaned_df[col].agg(['min', 'max', 'mean']).to_dict()
+                    for col in cleaned_df.select_dtypes(include=['number']).columns[:5]
+                })
+            }
+            session_data['messages'].append(upload_msg.to_dict())
+            session_data['messages'].append(health_msg.to_dict())
+
         logger.info(f"Upload successful for session {session_id}")
         
-        return jsonify({
+        return ojsonify({
             'success': True,
             'messages': [upload_msg.to_dict(), health_msg.to_dict()],
             'dataset_id': file_id
@@ -388,7 +857,7 @@ def upload_file():
     except (pd.errors.EmptyDataError, pd.errors.ParserError, MemoryError, Exception) as e:
         error_msg = handle_error(session_id, e, "file_upload")
         status_code = 413 if isinstance(e, MemoryError) else 400
-        return jsonify({'success': False, 'message': error_msg}), status_code
+        return ojsonify({'success': False, 'message': error_msg}), status_code
 
 
 @app.route('/api/chat', methods=['POST'])
@@ -397,19 +866,21 @@ def chat():
     try:
         data = request.get_json()
         if not data:
-            return jsonify({'error': 'Invalid request body'}), 400
+            return ojsonify({'error': 'Invalid request body'}), 400
             
         session_id = data.get('session_id')
         user_message = data.get('message', '').strip()
         
-        if not session_id or session_id not in sessions:
-            return jsonify({'error': 'Invalid or expired session. Please refresh the page.'}), 400
+        # Single lookup instead of membership check + read
+        session_data = sessions.get(session_id) if session_id else None
+        if session_data is None:
+            return ojsonify({'error': 'Invalid or expired session. Please refresh the page.'}), 400
         
         if not user_message:
-            return jsonify({'error': 'Message cannot be empty'}), 400
+            return ojsonify({'error': 'Message cannot be empty'}), 400
     except Exception as e:
         logger.error(f"Error parsing chat request: {e}")
-        return jsonify({'error': 'Invalid request format'}), 400
+        return ojsonify({'error': 'Invalid request format'}), 400
     
     # Store user message
     user_msg = ChatMessage(
@@ -417,25 +888,34 @@ def chat():
         content=user_message,
         metadata={'timestamp': datetime.now(timezone.utc).isoformat()}
     )
-    save_message_to_session(session_id, user_msg)
+    save_message_async(session_id, user_msg)
     
     # Check if dataset is loaded
-    session_data = sessions[session_id]
     if not session_data.get('dataset'):
         response_msg = ChatMessage(
             type=MessageType.SYSTEM,
             content="Please upload a dataset first before asking questions.",
             metadata={'timestamp': datetime.now(timezone.utc).isoformat()}
         )
-        save_message_to_session(session_id, response_msg)
-        return jsonify({'success': True, 'message': response_msg.to_dict()})
+        save_message_async(session_id, response_msg)
+        return ojsonify({'success': True, 'message': response_msg.to_dict()})
     
     # Phase 3: Process the query with AI
     try:
         # Load processed data
         dataset_info = session_data['dataset']
         processed_path = dataset_info['processed_path']
-        df = file_handler.load_file(processed_path)
+        df, df_schema = load_processed_df(processed_path, dataset_info['file_id'])
+        if dataset_info.get('stats'):
+            # Hand the upload-time numeric stats to the intent detector
+            # so its first context build skips the aggregation pass
+            df.attrs.setdefault('describe', dataset_info['stats'])
+
+        # Dataset facts were precomputed at upload time; older sessions
+        # fall back to the schema tuple cached with the frame
+        columns = dataset_info.get('columns') or df_schema.columns
+        df_dtypes = dataset_info.get('dtypes') or df_schema.dtypes
+        row_count = dataset_info.get('row_count', df_schema.row_count)
         
         # Get conversation history for context
         conversation_history = session_data['messages']
@@ -469,12 +949,14 @@ def chat():
                     'intent_result': intent_result
                 }
             )
-            save_message_to_session(session_id, response_msg)
-            return jsonify({'success': True, 'message': response_msg.to_dict()})
+            save_message_async(session_id, response_msg)
+            return ojsonify({'success': True, 'message': response_msg.to_dict()})
         
         # Phase 3.5: Query Refinement - Make queries more analytically useful
         logger.info("🎯 Phase 3.5: Refining query for better insights...")
-        dataset_context_brief = f"{len(df)} rows, {len(df.columns)} columns: {', '.join(df.columns.tolist()[:5])}"
+        dataset_context_brief = (
+            f"{row_count} rows, {len(columns)} columns: {', '.join(columns[:5])}"
+        )
         refinement = query_refiner.refine_query(
             user_message, 
             intent_result, 
@@ -491,7 +973,7 @@ def chat():
                     content=refined_display,
                     metadata={'timestamp': datetime.now(timezone.utc).isoformat()}
                 )
-                save_message_to_session(session_id, refinement_msg)
+                save_message_async(session_id, refinement_msg)
             
             # Use refined query for planning and code generation
             query_to_use = refinement.get('refined_query', user_message)
@@ -502,8 +984,8 @@ def chat():
         # Phase 4: Create execution plan
         logger.info("📋 Phase 4: Creating execution plan...")
         dataset_summary = {
-            'row_count': len(df),
-            'columns': df.columns.tolist()
+            'row_count': row_count,
+            'columns': columns
         }
         execution_plan = query_planner.create_plan(
             query_to_use,  # Use refined query
@@ -523,10 +1005,9 @@ def chat():
                     'type': 'execution_plan'
                 }
             )
-            save_message_to_session(session_id, plan_msg)
+            save_message_async(session_id, plan_msg)
         
         # Phase 5-7: Code generation, validation, and execution loop
-        df_dtypes = {col: str(dtype) for col, dtype in df.dtypes.items()}
         generated_code = None
         validation_result = None
         execution_result = None
@@ -540,7 +1021,7 @@ def chat():
                 query_to_use,  # Use refined query
                 intent_result,
                 execution_plan,
-                df.columns.tolist(),
+                columns,
                 df_dtypes
             )
             generated_code = code_result
@@ -559,13 +1040,13 @@ def chat():
                         'type': 'generated_code'
                     }
                 )
-                save_message_to_session(session_id, code_msg)
+                save_message_async(session_id, code_msg)
             
             # Phase 6: Validate code
             logger.info("🔍 Phase 6: Validating code...")
             validation_result = code_validator.validate(
                 code_result['code'],
-                df.columns.tolist()
+                columns
             )
             logger.info(f"Validation: {'✅ PASSED' if validation_result['valid'] else '❌ FAILED'}")
             
@@ -586,7 +1067,7 @@ def chat():
                         'type': 'validation_error'
                     }
                 )
-                save_message_to_session(session_id, validation_msg)
+                save_message_async(session_id, validation_msg)
                 
                 # Check if should retry
                 should_retry, feedback = retry_manager.should_retry(attempt + 1, validation_result)
@@ -597,7 +1078,7 @@ def chat():
                         content=retry_display,
                         metadata={'timestamp': datetime.now(timezone.utc).isoformat()}
                     )
-                    save_message_to_session(session_id, retry_msg)
+                    save_message_async(session_id, retry_msg)
                     continue  # Retry
                 else:
                     # Max retries reached
@@ -606,8 +1087,8 @@ def chat():
                         content="Failed to generate valid code after multiple attempts.",
                         metadata={'timestamp': datetime.now(timezone.utc).isoformat()}
                     )
-                    save_message_to_session(session_id, error_msg)
-                    return jsonify({'success': True, 'message': error_msg.to_dict()})
+                    save_message_async(session_id, error_msg)
+                    return ojsonify({'success': True, 'message': error_msg.to_dict()})
             
             # Phase 7: Execute code safely
             logger.info("⚡ Phase 7: Executing code in sandbox...")
@@ -620,6 +1101,19 @@ def chat():
                 
                 messages_to_send = []
                 
+                # Phase 8b is kicked off first so the answer-synthesis
+                # LLM call overlaps with insight generation below
+                query_context = {
+                    'refined_query': query_to_use if query_to_use != user_message else None,
+                    'execution_time': execution_result['execution_time']
+                }
+                answer_future = _SYNTHESIS_POOL.submit(
+                    answer_synthesizer.synthesize_answer,
+                    user_message,
+                    execution_result['result'],
+                    query_context
+                )
+                
                 # Phase 8a: Generate insights (charts, key findings)
                 # Pass requested chart type from query refinement
                 requested_chart = refinement.get('requested_chart_type') if refinement else None
@@ -642,20 +1136,12 @@ def chat():
                             'type': 'insights'
                         }
                     )
-                    save_message_to_session(session_id, insights_msg)
+                    save_message_async(session_id, insights_msg)
                     messages_to_send.append(insights_msg.to_dict())
                 
-                # Phase 8b: Synthesize plain-language answer
+                # Phase 8b: Collect the plain-language answer
                 try:
-                    query_context = {
-                        'refined_query': query_to_use if query_to_use != user_message else None,
-                        'execution_time': execution_result['execution_time']
-                    }
-                    answer = answer_synthesizer.synthesize_answer(
-                        user_message,
-                        execution_result['result'],
-                        query_context
-                    )
+                    answer = answer_future.result()
                     
                     if answer:
                         answer_display = answer_synthesizer.format_answer_for_display(answer)
@@ -667,7 +1153,7 @@ def chat():
                                 'type': 'answer'
                             }
                         )
-                        save_message_to_session(session_id, answer_msg)
+                        save_message_async(session_id, answer_msg)
                         messages_to_send.append(answer_msg.to_dict())
                         logger.info("✅ Answer synthesized successfully")
                     else:
@@ -680,7 +1166,7 @@ def chat():
                 
                 # Return all messages
                 if messages_to_send:
-                    return jsonify({
+                    return ojsonify({
                         'success': True,
                         'message': messages_to_send[0],
                         'additional_messages': messages_to_send[1:] if len(messages_to_send) > 1 else []
@@ -699,8 +1185,8 @@ def chat():
                             'type': 'execution_result'
                         }
                     )
-                    save_message_to_session(session_id, result_msg)
-                    return jsonify({
+                    save_message_async(session_id, result_msg)
+                    return ojsonify({
                         'success': True,
                         'message': result_msg.to_dict()
                     })
@@ -717,7 +1203,7 @@ def chat():
                         'type': 'execution_error'
                     }
                 )
-                save_message_to_session(session_id, error_msg)
+                save_message_async(session_id, error_msg)
                 
                 # Try regenerating code with error feedback
                 if attempt < retry_manager.max_retries - 1:
@@ -727,10 +1213,10 @@ def chat():
                         content=f"🔄 Regenerating code (Attempt {attempt + 2}/{retry_manager.max_retries})",
                         metadata={'timestamp': datetime.now(timezone.utc).isoformat()}
                     )
-                    save_message_to_session(session_id, retry_msg)
+                    save_message_async(session_id, retry_msg)
                     continue
                 else:
-                    return jsonify({'success': True, 'message': error_msg.to_dict()})
+                    return ojsonify({'success': True, 'message': error_msg.to_dict()})
         
         # If we get here, all retries failed
         final_error_msg = ChatMessage(
@@ -738,71 +1224,95 @@ def chat():
             content="Unable to execute query after multiple attempts.",
             metadata={'timestamp': datetime.now(timezone.utc).isoformat()}
         )
-        save_message_to_session(session_id, final_error_msg)
-        return jsonify({'success': True, 'message': final_error_msg.to_dict()})
+        save_message_async(session_id, final_error_msg)
+        return ojsonify({'success': True, 'message': final_error_msg.to_dict()})
     
     except (KeyError, FileNotFoundError, Exception) as e:
         error_msg = handle_error(session_id, e, "chat_query")
-        return jsonify({'success': True, 'message': error_msg})
+        return ojsonify({'success': True, 'message': error_msg})
 
 
 @app.route('/api/session/<session_id>/messages', methods=['GET'])
 def get_messages(session_id):
     """Retrieve all messages for a session"""
-    if session_id not in sessions:
-        return jsonify({'error': 'Session not found'}), 404
+    # Fast path: splice the store's pre-serialized message blobs into
+    # the body instead of decoding and re-encoding every message
+    if hasattr(sessions, 'raw_messages'):
+        blobs = sessions.raw_messages(session_id)
+        if blobs is None:
+            return ojsonify({'error': 'Session not found'}, 404)
+        body = (b'{"session_id":' + orjson.dumps(session_id)
+                + b',"messages":[' + b','.join(blobs) + b']}')
+        return Response(body, mimetype='application/json')
     
-    return jsonify({
+    session_data = sessions.get(session_id)
+    if session_data is None:
+        return ojsonify({'error': 'Session not found'}), 404
+    
+    return ojsonify({
         'session_id': session_id,
-        'messages': sessions[session_id]['messages']
+        'messages': session_data['messages']
     })
 
 
 @app.route('/api/session/<session_id>/preview', methods=['GET'])
 def preview_data(session_id):
     """Preview the preprocessed dataset"""
-    if session_id not in sessions:
-        return jsonify({'error': 'Session not found'}), 404
+    session_data = sessions.get(session_id)
+    if session_data is None:
+        return ojsonify({'error': 'Session not found'}), 404
     
-    session_data = sessions[session_id]
     if not session_data.get('dataset'):
-        return jsonify({'error': 'No dataset loaded'}), 400
+        return ojsonify({'error': 'No dataset loaded'}), 400
     
     try:
-        # Load processed data
-        processed_path = session_data['dataset']['processed_path']
-        df = file_handler.load_file(processed_path)
-        
-        # Get preview (first 100 rows)
-        preview_df = df.head(100)
-        
-        # Convert datetime columns to strings for JSON serialization
-        for col in preview_df.columns:
-            if pd.api.types.is_datetime64_any_dtype(preview_df[col]):
-                preview_df[col] = preview_df[col].astype(str)
+        # Reuse the frame a chat turn already loaded; on a cold cache,
+        # read only the preview rows from disk instead of the whole file
+        dataset_info = session_data['dataset']
+        processed_path = dataset_info['processed_path']
+        cache_key = (dataset_info['file_id'], os.stat(processed_path).st_mtime_ns)
+        cached = _DF_CACHE.get(cache_key)
+        if cached is not None:
+            full_df, df_schema = cached
+            preview_df = full_df.head(100)
+            total_rows = df_schema.row_count
+            columns = df_schema.columns
+            dtypes = df_schema.dtypes
+        else:
+            preview_df = file_handler.load_file(processed_path, nrows=100)
+            # Dataset facts were stashed at upload time, so the limited
+            # read doesn't need to see the rest of the file
+            total_rows = dataset_info.get('row_count', len(preview_df))
+            columns = dataset_info.get('columns') or preview_df.columns.tolist()
+            dtypes = dataset_info.get('dtypes') or {
+                col: str(dtype) for col, dtype in preview_df.dtypes.items()
+            }
         
-        # Convert to records format for JSON
-        preview_data = {
-            'total_rows': len(df),
-            'total_columns': len(df.columns),
+        # Rows go straight from the block manager to JSON bytes in C -
+        # to_dict('records') would box every cell into Python objects
+        # only for the encoder to unbox them again
+        records_json = preview_df.to_json(orient='records', date_format='iso')
+        meta = {
+            'total_rows': total_rows,
+            'total_columns': len(columns),
             'preview_rows': len(preview_df),
-            'columns': df.columns.tolist(),
-            'dtypes': {col: str(dtype) for col, dtype in df.dtypes.items()},
-            'data': convert_numpy_types(preview_df.to_dict('records')),
-            'preprocessing_applied': session_data['dataset']['preprocessing_manifest']['steps_applied']
+            'columns': columns,
+            'dtypes': dtypes,
+            'preprocessing_applied': dataset_info['preprocessing_manifest']['steps_applied']
         }
-        
-        return jsonify(preview_data)
+        # Splice the pre-serialized rows into the encoded wrapper
+        body = orjson.dumps(meta)[:-1] + b',"data":' + records_json.encode() + b'}'
+        return Response(body, mimetype='application/json')
         
     except Exception as e:
         logger.error(f"Preview failed: {e}", exc_info=True)
-        return jsonify({'error': str(e)}), 500
+        return ojsonify({'error': str(e)}), 500
 
 
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
-    return jsonify({
+    return ojsonify({
         'status': 'healthy',
         'version': '1.0.0',
         'api_version': 'v1',
@@ -3,9 +3,9 @@ Chat Message Model
 Represents different types of messages in the chat interface
 """
 from enum import Enum
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, field
 from typing import Optional, Dict, Any
-from datetime import datetime
+from datetime import datetime, timezone
 
 
 class MessageType(Enum):
@@ -18,23 +18,43 @@ class MessageType(Enum):
     CLARIFICATION = "clarification"
 
 
-@dataclass
+@dataclass(slots=True)
 class ChatMessage:
     """
     Represents a single message in the chat interface
+
+    Slotted: chat turns create many short-lived messages and long
+    sessions hold thousands, so skipping the per-instance __dict__
+    saves real memory.
     """
     type: MessageType
     content: str
     metadata: Optional[Dict[str, Any]] = None
+    _cached_dict: Optional[Dict[str, Any]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
     
     def to_dict(self):
-        """Convert to dictionary for JSON serialization"""
-        return {
+        """Convert to dictionary for JSON serialization
+
+        Memoized: messages are converted at least twice per turn (once
+        for the session log, once for the response payload), and the
+        metadata can carry large manifests/insights. Messages are not
+        mutated after construction, so the first dict stays valid.
+        """
+        if self._cached_dict is not None:
+            return self._cached_dict
+        # Only hit the clock when metadata doesn't already carry a stamp
+        timestamp = (self.metadata or {}).get('timestamp')
+        if timestamp is None:
+            timestamp = datetime.now(timezone.utc).isoformat()
+        self._cached_dict = {
             'type': self.type.value,
             'content': self.content,
             'metadata': self.metadata or {},
-            'timestamp': self.metadata.get('timestamp', datetime.utcnow().isoformat()) if self.metadata else datetime.utcnow().isoformat()
+            'timestamp': timestamp
         }
+        return self._cached_dict
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]):
@@ -3,27 +3,86 @@ AI-Powered Intent Detection Service
 Uses Groq LLM to intelligently understand user queries with dataset context
 Phase 3: Conversational Intake (Enhanced)
 """
+import hashlib
 import json
 import os
+import re
+import orjson
+from collections import OrderedDict
 from typing import Dict, List, Any, Optional
-from groq import Groq
+from services.groq_client import get_client
 import pandas as pd
 
 
+# Static system prompt built once at import: several KB of string that
+# never varies between calls
+_SYSTEM_PROMPT = """Expert data analyst. Extract structured intent from natural language queries.
+
+TASK: Analyze user query + dataset context → Return JSON with intent, columns, operations.
+
+INTENTS:
+• summary: Overview/summary | aggregate: Stats (avg, sum, count, min, max)
+• filter: Filter rows | top_bottom: Top/bottom N by column | group_by: Aggregate by group
+• distribution: Value breakdown | compare: Compare groups | trend: Time analysis
+• correlation: Relationships | visualization: Change chart type for existing data
+
+JSON FORMAT:
+{
+  "intent": "intent_name",
+  "confidence": 0.95,
+  "columns": ["col1", "col2"],
+  "aggregation": "mean|sum|count|min|max|median|null",
+  "filters": [{"column": "col", "operator": ">|<|==|!=|>=|<=", "value": "val"}],
+  "group_by": "column_name or null",
+  "sort_by": {"column": "name", "ascending": true/false} or null,
+  "limit": 10 or null,
+  "clarifications_needed": [],
+  "explanation": "Brief explanation"
+}
+
+CRITICAL RULES:
+• Use EXACT column names from dataset (case-sensitive)
+• Smart matching: "price" → "close_price" if only price column
+• Minimal clarifications - make intelligent guesses when reasonable
+• "highest valued stock" = top N sorted by value (not just 1)
+• Conversational context: "bar graph" after "top 10 companies" = bar graph of THOSE companies
+• Follow-up viz requests: intent="visualization", preserve previous data context
+
+GROWTH QUERIES:
+• "highest growing" = PERCENTAGE GROWTH, not highest value
+• "fastest growing" = GROWTH RATE | "biggest increase" = CHANGE/GROWTH
+• Calculation: (current - previous) / previous * 100 or (close - open) / open * 100
+• Capture growth intent in "explanation", let query planner determine method
+
+CONVERSATION CONTEXT:
+• Track previous queries: "top 10 X" → "bar graph" = visualize same data
+• Pronouns: "analyze its growth" = company from previous context
+• Maintain continuity across conversation"""
+
+
 class AIIntentDetector:
     """
     AI-powered intent detector that uses Groq to understand queries with full dataset context
     """
+
+    # Part of the intent-cache key; bump whenever _build_system_prompt
+    # changes so stale cached intents don't outlive the prompt
+    PROMPT_VERSION = 'v1'
+
     
     def __init__(self):
-        api_key = os.environ.get('GROQ_API_KEY', '')
-        if not api_key:
-            raise ValueError(
-                "GROQ_API_KEY not found in environment variables. "
-                "Please set it in your .env file or environment."
-            )
-        self.client = Groq(api_key=api_key)
+        # Process-wide pooled client shared by every service
+        self.client = get_client()
         self.model = "llama-3.3-70b-versatile"  # Fast and smart
+        # Context strings are immutable per loaded frame; caching them
+        # turns the per-column scan into a dict lookup on repeat turns
+        self._ctx_cache = OrderedDict()
+        self._ctx_cache_max = 8
+        # Detected intents keyed by (prompt version, normalized query,
+        # dataset fingerprint, conversation tail) - retried and repeated
+        # questions skip the Groq round-trip entirely
+        self._intent_cache = OrderedDict()
+        self._intent_cache_max = 256
         
     def detect_intent(
         self, 
@@ -42,8 +101,17 @@ class AIIntentDetector:
         Returns:
             Structured intent with all parameters needed for execution
         """
-        # Build dataset context
-        dataset_context = self._build_dataset_context(df)
+        # Build dataset context (cached per frame - the dataset never
+        # changes within a session, so the scan is pure redundant work)
+        ctx_key = (id(df), df.shape, tuple(df.columns))
+        dataset_context = self._ctx_cache.get(ctx_key)
+        if dataset_context is None:
+            dataset_context = self._build_dataset_context(df)
+            self._ctx_cache[ctx_key] = dataset_context
+            if len(self._ctx_cache) > self._ctx_cache_max:
+                self._ctx_cache.popitem(last=False)
+        else:
+            self._ctx_cache.move_to_end(ctx_key)
         
         # Build conversation context
         conversation_context = ""
@@ -54,28 +122,57 @@ class AIIntentDetector:
                 for msg in recent_messages
             ])
         
+        # Short-circuit repeats: same normalized query against the same
+        # dataset with the same recent conversation yields the same intent
+        norm_query = re.sub(r'\s+', ' ', query.strip().lower())
+        cache_key = (
+            self.PROMPT_VERSION,
+            norm_query,
+            self._dataset_fingerprint(df),
+            hashlib.blake2b(conversation_context.encode(), digest_size=8).digest()
+        )
+        cached = self._intent_cache.get(cache_key)
+        if cached is not None:
+            self._intent_cache.move_to_end(cache_key)
+            # Fresh copies of the mutable bits so callers can't poison
+            # the cached entry
+            return {**cached, 'entities': {'columns': list(cached['entities']['columns'])}}
+        
         # Build the prompt
-        system_prompt = self._build_system_prompt()
+        system_prompt = _SYSTEM_PROMPT
         user_prompt = self._build_user_prompt(query, dataset_context, conversation_context)
         
         try:
-            # Call Groq API
-            response = self.client.chat.completions.create(
+            # Call Groq API. Streaming + a tight token budget: intent
+            # JSON is ~200 tokens, and generation time scales with the
+            # budget, so 512 halves worst-case latency vs the old 1000
+            # while bytes arrive as they're generated.
+            stream = self.client.chat.completions.create(
                 model=self.model,
                 messages=[
                     {"role": "system", "content": system_prompt},
                     {"role": "user", "content": user_prompt}
                 ],
                 temperature=0.1,  # Low temperature for consistent, focused responses
-                max_tokens=1000,
-                response_format={"type": "json_object"}
+                max_tokens=512,
+                response_format={"type": "json_object"},
+                stream=True
             )
             
-            # Parse response
-            result = json.loads(response.choices[0].message.content)
+            # Accumulate deltas and parse once; JSON mode guarantees a
+            # well-formed object at end of stream
+            buf = bytearray()
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    buf += chunk.choices[0].delta.content.encode()
+            result = orjson.loads(bytes(buf))
             
             # Validate and structure the result
-            return self._validate_and_structure_result(result, df.columns.tolist())
+            structured = self._validate_and_structure_result(result, df.columns.tolist())
+            self._intent_cache[cache_key] = structured
+            if len(self._intent_cache) > self._intent_cache_max:
+                self._intent_cache.popitem(last=False)
+            return structured
             
         except Exception as e:
             print(f"⚠️ AI Intent Detection failed: {str(e)}")
@@ -94,6 +191,18 @@ class AIIntentDetector:
                 'original_query': query
             }
     
+    @staticmethod
+    def _dataset_fingerprint(df: pd.DataFrame) -> str:
+        """Content hash of the frame's head, memoized on the frame"""
+        fingerprint = df.attrs.get('_intent_fingerprint')
+        if fingerprint is None:
+            fingerprint = hashlib.blake2b(
+                pd.util.hash_pandas_object(df.head(1000), index=False).values.tobytes(),
+                digest_size=16
+            ).hexdigest()
+            df.attrs['_intent_fingerprint'] = fingerprint
+        return fingerprint
+
     def _build_dataset_context(self, df: pd.DataFrame) -> str:
         """Build lean but sufficient dataset context for the AI"""
         context_parts = []
@@ -101,75 +210,54 @@ class AIIntentDetector:
         # Basic info
         context_parts.append(f"Dataset: {len(df)} rows × {len(df.columns)} columns\n")
         
-        # Column information with types and 2 sample values only
+        # Column information with types and 2 sample values only.
+        # Dtypes come from one frame-level call, and samples are drawn
+        # from the first rows so no full-column unique() hash is built.
         context_parts.append("Columns:")
-        for col in df.columns:
-            dtype = str(df[col].dtype)
-            
-            # Get 2 sample values (sufficient for AI to understand data)
-            sample_values = df[col].dropna().unique()[:2].tolist()
-            sample_str = ", ".join([str(v)[:40] for v in sample_values])
-            
-            # Simplified format - AI doesn't need null counts for every column
-            context_parts.append(f"  - {col} ({dtype}): {sample_str}")
+        dtypes = df.dtypes.astype(str)
+        sample_rows = df.head(20)
+        # 2 distinct sample values per column (sufficient for the AI to
+        # understand the data); drop_duplicates keeps the original dtype
+        # and avoids unique()'s array materialization. One templated
+        # join renders the whole block in a single allocation instead of
+        # an f-string and append per column.
+        context_parts.append("\n".join(
+            "  - %s (%s): %s" % (
+                col,
+                dtypes[col],
+                ", ".join(
+                    str(v)[:40]
+                    for v in sample_rows[col].dropna().drop_duplicates().iloc[:2]
+                ),
+            )
+            for col in df.columns
+        ))
         
-        # Quick statistics for top 5 numeric columns (reduced from 10)
-        numeric_cols = df.select_dtypes(include=['number']).columns
+        # Quick statistics for top 5 numeric columns. Preprocessing
+        # stashes these on df.attrs at upload time; only frames without
+        # them pay the (single, batched) agg pass here.
+        numeric_cols = df.select_dtypes(include=['number']).columns[:5]
         if len(numeric_cols) > 0:
+            stats = df.attrs.get('describe')
+            if stats is None:
+                agg = df[numeric_cols].agg(['min', 'max', 'mean'])
+                stats = {col: agg[col].to_dict() for col in numeric_cols}
             context_parts.append("\nKey Statistics:")
-            for col in numeric_cols[:5]:
-                stats = df[col].describe()
-                # 1 decimal place is sufficient for AI understanding
-                context_parts.append(
-                    f"  - {col}: range {stats['min']:.1f}-{stats['max']:.1f}, avg {stats['mean']:.1f}"
+            # 1 decimal place is sufficient for AI understanding
+            context_parts.append("\n".join(
+                "  - %s: range %.1f-%.1f, avg %.1f" % (
+                    col, col_stats['min'], col_stats['max'], col_stats['mean']
                 )
+                for col in numeric_cols
+                if (col_stats := stats.get(col))
+            ))
         
         return "\n".join(context_parts)
     
-    def _build_system_prompt(self) -> str:
-        """Build the system prompt for the AI"""
-        return """Expert data analyst. Extract structured intent from natural language queries.
-
-TASK: Analyze user query + dataset context → Return JSON with intent, columns, operations.
-
-INTENTS:
-• summary: Overview/summary | aggregate: Stats (avg, sum, count, min, max)
-• filter: Filter rows | top_bottom: Top/bottom N by column | group_by: Aggregate by group
-• distribution: Value breakdown | compare: Compare groups | trend: Time analysis
-• correlation: Relationships | visualization: Change chart type for existing data
-
-JSON FORMAT:
-{
-  "intent": "intent_name",
-  "confidence": 0.95,
-  "columns": ["col1", "col2"],
-  "aggregation": "mean|sum|count|min|max|median|null",
-  "filters": [{"column": "col", "operator": ">|<|==|!=|>=|<=", "value": "val"}],
-  "group_by": "column_name or null",
-  "sort_by": {"column": "name", "ascending": true/false} or null,
-  "limit": 10 or null,
-  "clarifications_needed": [],
-  "explanation": "Brief explanation"
-}
-
-CRITICAL RULES:
-• Use EXACT column names from dataset (case-sensitive)
-• Smart matching: "price" → "close_price" if only price column
-• Minimal clarifications - make intelligent guesses when reasonable
-• "highest valued stock" = top N sorted by value (not just 1)
-• Conversational context: "bar graph" after "top 10 companies" = bar graph of THOSE companies
-• Follow-up viz requests: intent="visualization", preserve previous data context
-
-GROWTH QUERIES:
-• "highest growing" = PERCENTAGE GROWTH, not highest value
-• "fastest growing" = GROWTH RATE | "biggest increase" = CHANGE/GROWTH
-• Calculation: (current - previous) / previous * 100 or (close - open) / open * 100
-• Capture growth intent in "explanation", let query planner determine method
-
-CONVERSATION CONTEXT:
-• Track previous queries: "top 10 X" → "bar graph" = visualize same data
-• Pronouns: "analyze its growth" = company from previous context
-• Maintain continuity across conversation"""
+    @staticmethod
+    def _build_system_prompt() -> str:
+        """Return the static system prompt (module-level constant)"""
+        return _SYSTEM_PROMPT
 
     def _build_user_prompt(
         self, 
@@ -211,11 +299,11 @@ CONVERSATION CONTEXT:
             'original_query': result.get('original_query', '')
         }
         
-        # Validate column names exist
-        valid_columns = []
-        for col in structured['entities']['columns']:
-            if col in available_columns:
-                valid_columns.append(col)
-        structured['entities']['columns'] = valid_columns
+        # Validate column names exist (set lookup: wide frames would
+        # otherwise pay O(referenced x available) list scans)
+        available = set(available_columns)
+        structured['entities']['columns'] = [
+            col for col in structured['entities']['columns'] if col in available
+        ]
         
         return structured
@@ -58,6 +58,18 @@ class CodeValidator:
             r'\bplt\s*\.',
         ]
         
+        # Compile once at init: one combined alternation acts as a cheap
+        # pre-filter over the whole code string, and the individual
+        # patterns only run (for per-match line numbers) when it fires.
+        # Safe code - the overwhelming majority - costs a single scan.
+        self._compiled_blacklist = [
+            re.compile(pattern, re.IGNORECASE) for pattern in self.blacklist_patterns
+        ]
+        self._blacklist_prefilter = re.compile(
+            '|'.join(f'(?:{pattern})' for pattern in self.blacklist_patterns),
+            re.IGNORECASE
+        )
+        
         # Required patterns
         self.required_patterns = [
             (r'\bresult\s*=', 'Must assign final result to variable "result"'),
@@ -121,8 +133,12 @@ class CodeValidator:
     def _check_security(self, code: str) -> List[Dict[str, Any]]:
         """Check for dangerous operations"""
         errors = []
-        for pattern in self.blacklist_patterns:
-            matches = re.finditer(pattern, code, re.IGNORECASE)
+        # Fast path: no dangerous substring anywhere, skip per-pattern scan
+        if not self._blacklist_prefilter.search(code):
+            return errors
+        
+        for pattern in self._compiled_blacklist:
+            matches = pattern.finditer(code)
             for match in matches:
                 line_num = code[:match.start()].count('\n') + 1
                 errors.append({
@@ -3,38 +3,87 @@ File Handler Service
 Handles file uploads, validation, and loading
 """
 import pandas as pd
+import pyarrow.parquet as pq
 import os
+import shutil
 from typing import Optional
 
+# 1MB copy buffer: werkzeug's default save() streams in 16KB chunks,
+# which is ~64x more Python-level read/write pairs for big uploads
+UPLOAD_COPY_BUFFER = 1024 * 1024
+
 
 class FileHandler:
     """Manages file operations for uploaded datasets"""
-    
+
     def __init__(self, upload_folder: str):
         self.upload_folder = upload_folder
-    
-    def load_file(self, file_path: str) -> pd.DataFrame:
+
+    def save_upload(self, file_storage, dest_path: str) -> None:
+        """Save an uploaded file with large-buffer streaming"""
+        with open(dest_path, 'wb') as dst:
+            shutil.copyfileobj(file_storage.stream, dst, length=UPLOAD_COPY_BUFFER)
+
+    def load_file(self, file_path: str, nrows: Optional[int] = None) -> pd.DataFrame:
         """
         Load a file into a pandas DataFrame
-        Supports CSV and Excel formats
+        Supports CSV, Excel and Parquet formats
+
+        When nrows is given, only that many rows are read from disk -
+        I/O is then proportional to the preview size, not the file size.
         """
         _, ext = os.path.splitext(file_path)
         ext = ext.lower()
-        
+
         if ext == '.csv':
             # Try different encodings
             for encoding in ['utf-8', 'latin-1', 'iso-8859-1']:
                 try:
-                    return pd.read_csv(file_path, encoding=encoding)
+                    return pd.read_csv(file_path, encoding=encoding, nrows=nrows)
                 except UnicodeDecodeError:
                     continue
             raise ValueError("Could not decode CSV file with supported encodings")
-        
+
         elif ext in ['.xlsx', '.xls']:
-            return pd.read_excel(file_path)
-        
+            return pd.read_excel(file_path, nrows=nrows)
+
+        elif ext == '.parquet':
+            if nrows is not None:
+                # Pull just the first batch(es) instead of decoding
+                # every row group
+                batches = pq.ParquetFile(file_path).iter_batches(batch_size=nrows)
+                try:
+                    return next(batches).to_pandas().head(nrows)
+                except StopIteration:
+                    return pd.DataFrame()
+            # Memory-mapped columnar read: no text parsing or dtype
+            # inference, so reloads are near-instant even for wide frames
+            table = pq.read_table(file_path, memory_map=True)
+            return table.to_pandas(split_blocks=True)
+
         else:
             raise ValueError(f"Unsupported file format: {ext}")
+
+    def save_processed(self, df: pd.DataFrame, processed_folder: str, file_id: str, filename: str) -> str:
+        """
+        Persist a processed DataFrame and return the saved path
+
+        Prefers Parquet (columnar, dictionary-encoded) so per-request
+        reloads become a mmap instead of a full CSV re-parse; falls back
+        to the original format if the frame can't be written as Parquet
+        (e.g. columns with mixed object types).
+        """
+        parquet_path = os.path.join(processed_folder, f"{file_id}.parquet")
+        try:
+            df.to_parquet(parquet_path, engine='pyarrow', compression='zstd', index=False)
+            return parquet_path
+        except Exception:
+            fallback_path = os.path.join(processed_folder, f"{file_id}_{filename}")
+            if filename.endswith('.csv'):
+                df.to_csv(fallback_path, index=False)
+            else:
+                df.to_excel(fallback_path, index=False)
+            return fallback_path
     
     def validate_file_size(self, file_path: str, max_size_mb: int = 50) -> bool:
         """Check if file size is within limits"""
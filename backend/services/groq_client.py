@@ -0,0 +1,40 @@
+"""
+Shared Groq Client
+One process-wide client with a pooled keep-alive HTTP transport
+"""
+import os
+import httpx
+from groq import Groq
+
+_client = None
+
+
+def get_client() -> Groq:
+    """Return the process-wide Groq client, creating it on first use
+
+    All services share one httpx pool, so TCP+TLS handshakes are reused
+    across intent detection, refinement, planning, code generation and
+    answer synthesis instead of each service warming its own
+    connections (~100-300ms saved per cold call).
+    """
+    global _client
+    if _client is None:
+        api_key = os.environ.get('GROQ_API_KEY', '')
+        if not api_key:
+            raise ValueError(
+                "GROQ_API_KEY not found in environment variables. "
+                "Please set it in your .env file or environment."
+            )
+        _client = Groq(
+            api_key=api_key,
+            http_client=httpx.Client(
+                http2=True,
+                limits=httpx.Limits(
+                    max_keepalive_connections=32,
+                    max_connections=64,
+                    keepalive_expiry=300
+                ),
+                timeout=30
+            )
+        )
+    return _client
@@ -6,7 +6,7 @@ Phase 4: Planning Canvas
 import json
 import os
 from typing import Dict, List, Any, Optional
-from groq import Groq
+from services.groq_client import get_client
 
 
 class QueryPlanner:
@@ -15,10 +15,8 @@ class QueryPlanner:
     """
     
     def __init__(self):
-        api_key = os.environ.get('GROQ_API_KEY', '')
-        if not api_key:
-            raise ValueError("GROQ_API_KEY not found")
-        self.client = Groq(api_key=api_key)
+        # Process-wide pooled client shared by every service
+        self.client = get_client()
         self.model = "llama-3.3-70b-versatile"
     
     def create_plan(
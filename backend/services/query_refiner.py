@@ -5,7 +5,7 @@ Converts literal queries into more useful analytical queries
 """
 import json
 from typing import Dict, Any
-from groq import Groq
+from services.groq_client import get_client
 import os
 
 
@@ -20,11 +20,8 @@ class QueryRefiner:
     """
     
     def __init__(self):
-        api_key = os.getenv('GROQ_API_KEY')
-        if not api_key:
-            raise ValueError("GROQ_API_KEY not found in environment variables")
-        
-        self.client = Groq(api_key=api_key)
+        # Process-wide pooled client shared by every service
+        self.client = get_client()
         self.model = "llama-3.3-70b-versatile"
     
     def refine_query(
@@ -5,6 +5,7 @@ Phase 7: Safe Execution
 """
 import pandas as pd
 import numpy as np
+import os
 import sys
 import io
 import signal
@@ -12,6 +13,17 @@ from typing import Dict, List, Any, Optional
 from contextlib import redirect_stdout, redirect_stderr
 import traceback
 
+try:
+    from services import jit_kernels
+except ImportError:  # numba not installed - exec path still works
+    jit_kernels = None
+
+from services import polars_backend
+
+# Feature flag: DATAFRAME_BACKEND=polars routes translatable queries
+# through polars' multi-threaded engine (see config.py)
+DATAFRAME_BACKEND = os.environ.get('DATAFRAME_BACKEND', 'pandas')
+
 
 class ExecutionTimeout(Exception):
     """Raised when code execution times out"""
@@ -35,6 +47,8 @@ class SafeExecutor:
     ):
         self.timeout_seconds = timeout_seconds
         self.max_memory_mb = max_memory_mb
+        if jit_kernels is not None:
+            jit_kernels.warmup()
     
     def execute(
         self,
@@ -58,6 +72,34 @@ class SafeExecutor:
         import time
         start_time = time.time()
         
+        # Optional polars backend: translate simple patterns onto its
+        # multi-threaded engine, falling back to pandas on a miss
+        if DATAFRAME_BACKEND == 'polars' and polars_backend.available():
+            pl_result = polars_backend.try_polars_execute(code, df)
+            if pl_result is not polars_backend.POLARS_MISS:
+                return {
+                    'success': True,
+                    'result': pl_result,
+                    'stdout': '',
+                    'stderr': '',
+                    'execution_time': time.time() - start_time,
+                    'result_type': type(pl_result).__name__
+                }
+        
+        # Fast path: simple single-assignment patterns (top-N, scalar
+        # reductions) run on compiled numba kernels without entering exec
+        if jit_kernels is not None:
+            jit_result = jit_kernels.try_jit_execute(code, df)
+            if jit_result is not jit_kernels.JIT_MISS:
+                return {
+                    'success': True,
+                    'result': jit_result,
+                    'stdout': '',
+                    'stderr': '',
+                    'execution_time': time.time() - start_time,
+                    'result_type': type(jit_result).__name__
+                }
+        
         # Capture stdout/stderr
         stdout_capture = io.StringIO()
         stderr_capture = io.StringIO()
@@ -0,0 +1,106 @@
+"""
+Tests for JIT Aggregation Kernels
+Parity checks against the pandas operations the kernels replace
+"""
+import pytest
+import numpy as np
+import pandas as pd
+from services.jit_kernels import JIT_MISS, try_jit_execute
+
+
+class TestNlargestParity:
+    """Kernel nlargest must match pandas row-for-row"""
+
+    @pytest.fixture
+    def float_df(self):
+        return pd.DataFrame({
+            'price': [10.0, 50.0, np.nan, 30.0, 50.0, 20.0],
+            'symbol': ['A', 'B', 'C', 'D', 'E', 'F']
+        })
+
+    def test_matches_pandas_with_nans(self, float_df):
+        """NaN rows are skipped, same as pandas nlargest"""
+        result = try_jit_execute("result = df.nlargest(3, 'price')", float_df)
+        expected = float_df.nlargest(3, 'price')
+        pd.testing.assert_frame_equal(result, expected)
+
+    def test_ties_keep_first_occurrence(self, float_df):
+        """Equal values come back in occurrence order (keep='first')"""
+        result = try_jit_execute("result = df.nlargest(2, 'price')", float_df)
+        expected = float_df.nlargest(2, 'price')
+        pd.testing.assert_frame_equal(result, expected)
+        assert result['symbol'].tolist() == ['B', 'E']
+
+    def test_result_sorted_descending(self, float_df):
+        """Rows are ordered largest-first like pandas, not just selected"""
+        result = try_jit_execute("result = df.nlargest(3, 'price')", float_df)
+        values = result['price'].tolist()
+        assert values == sorted(values, reverse=True)
+
+    def test_integer_dtype(self):
+        """Integer columns take the kernel path and match pandas"""
+        df = pd.DataFrame({'volume': [3, 1, 4, 1, 5, 9, 2, 6]})
+        result = try_jit_execute("result = df.nlargest(4, 'volume')", df)
+        pd.testing.assert_frame_equal(result, df.nlargest(4, 'volume'))
+
+    def test_k_larger_than_frame(self, float_df):
+        """k > len(df) clamps to the valid rows, same as pandas"""
+        result = try_jit_execute("result = df.nlargest(100, 'price')", float_df)
+        expected = float_df.nlargest(100, 'price')
+        pd.testing.assert_frame_equal(result, expected)
+
+    def test_all_nan_column(self):
+        """A column of only NaNs yields an empty frame"""
+        df = pd.DataFrame({'price': [np.nan, np.nan]})
+        result = try_jit_execute("result = df.nlargest(2, 'price')", df)
+        assert len(result) == 0
+
+
+class TestReductionParity:
+    """Scalar reductions must match pandas NaN-skipping semantics"""
+
+    @pytest.fixture
+    def series_df(self):
+        return pd.DataFrame({'price': [1.5, np.nan, 2.5, 4.0, np.nan]})
+
+    @pytest.mark.parametrize('op', ['sum', 'mean', 'min', 'max'])
+    def test_matches_pandas(self, series_df, op):
+        result = try_jit_execute(f"result = df['price'].{op}()", series_df)
+        expected = getattr(series_df['price'], op)()
+        assert result == pytest.approx(expected)
+
+    def test_mean_of_all_nans_is_nan(self):
+        df = pd.DataFrame({'price': [np.nan, np.nan]})
+        result = try_jit_execute("result = df['price'].mean()", df)
+        assert np.isnan(result)
+
+
+class TestMissBehavior:
+    """Anything outside the known patterns must fall through to exec"""
+
+    @pytest.fixture
+    def df(self):
+        return pd.DataFrame({
+            'price': [1.0, 2.0, 3.0],
+            'symbol': ['A', 'B', 'C']
+        })
+
+    def test_unknown_pattern_misses(self, df):
+        assert try_jit_execute("result = df.groupby('symbol').sum()", df) is JIT_MISS
+
+    def test_non_numeric_column_misses(self, df):
+        assert try_jit_execute("result = df.nlargest(2, 'symbol')", df) is JIT_MISS
+
+    def test_missing_column_misses(self, df):
+        assert try_jit_execute("result = df.nlargest(2, 'missing')", df) is JIT_MISS
+
+    def test_side_effect_statement_misses(self, df):
+        """Extra statements with side effects force the sandboxed path"""
+        code = "df.pop('symbol')\nresult = df.nlargest(2, 'price')"
+        assert try_jit_execute(code, df) is JIT_MISS
+
+    def test_docstring_is_tolerated(self, df):
+        """A bare constant expression (docstring) doesn't force a miss"""
+        code = '"""top rows"""\nresult = df.nlargest(2, \'price\')'
+        result = try_jit_execute(code, df)
+        pd.testing.assert_frame_equal(result, df.nlargest(2, 'price'))
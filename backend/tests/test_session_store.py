@@ -0,0 +1,128 @@
+"""
+Tests for File Session Store
+Round-trips through the pickle format, the JSONL side log, and the
+legacy plain-JSON migration path
+"""
+import os
+import orjson
+import pytest
+from main import FileSessionStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return FileSessionStore(str(tmp_path))
+
+
+@pytest.fixture
+def session():
+    return {
+        'id': 'abc123',
+        'created_at': '2026-01-01T00:00:00',
+        'messages': [{'role': 'user', 'content': 'hello'}]
+    }
+
+
+class TestRoundTrip:
+    """Sessions read back exactly as written"""
+
+    def test_set_get(self, store, session):
+        store['abc123'] = session
+        assert store['abc123'] == session
+
+    def test_contains_and_keys(self, store, session):
+        assert 'abc123' not in store
+        store['abc123'] = session
+        assert 'abc123' in store
+        assert store.keys() == ['abc123']
+
+    def test_missing_session_raises(self, store):
+        with pytest.raises(KeyError):
+            store['missing']
+
+    def test_get_default(self, store):
+        assert store.get('missing') is None
+        assert store.get('missing', {}) == {}
+
+    def test_returned_dict_is_a_copy(self, store, session):
+        store['abc123'] = session
+        first = store['abc123']
+        first['messages'].append({'role': 'assistant', 'content': 'hi'})
+        assert len(store['abc123']['messages']) == 1
+
+    def test_pop_removes_everything(self, store, session, tmp_path):
+        store['abc123'] = session
+        store.append_message('abc123', {'role': 'assistant', 'content': 'hi'})
+        assert store.pop('abc123')['id'] == 'abc123'
+        assert 'abc123' not in store
+        # Only the FileLock sidecar may remain
+        leftovers = [p.name for p in tmp_path.iterdir() if not p.name.endswith('.lock')]
+        assert leftovers == []
+        assert store.pop('abc123', 'gone') == 'gone'
+
+
+class TestSideLog:
+    """Appended messages merge with the base file on every read"""
+
+    def test_append_merges_on_read(self, store, session):
+        store['abc123'] = session
+        store.append_message('abc123', {'role': 'assistant', 'content': 'hi'})
+        messages = store['abc123']['messages']
+        assert [m['content'] for m in messages] == ['hello', 'hi']
+
+    def test_full_save_folds_side_log(self, store, session, tmp_path):
+        store['abc123'] = session
+        store.append_message('abc123', {'role': 'assistant', 'content': 'hi'})
+        data = store['abc123']
+        store['abc123'] = data
+        assert not (tmp_path / 'abc123.jsonl').exists()
+        assert [m['content'] for m in store['abc123']['messages']] == ['hello', 'hi']
+
+    def test_raw_messages_includes_side_log(self, store, session):
+        store['abc123'] = session
+        store.append_message('abc123', {'role': 'assistant', 'content': 'hi'})
+        blobs = store.raw_messages('abc123')
+        decoded = [orjson.loads(b) for b in blobs]
+        assert [m['content'] for m in decoded] == ['hello', 'hi']
+
+    def test_raw_messages_missing_session(self, store):
+        assert store.raw_messages('missing') is None
+
+
+class TestLegacyMigration:
+    """Pre-pickle .json sessions stay readable until their next save"""
+
+    @pytest.fixture
+    def legacy_store(self, tmp_path, session):
+        (tmp_path / 'abc123.json').write_bytes(orjson.dumps(session))
+        return FileSessionStore(str(tmp_path))
+
+    def test_legacy_read(self, legacy_store, session):
+        assert 'abc123' in legacy_store
+        assert legacy_store['abc123'] == session
+
+    def test_legacy_side_log_merges(self, legacy_store):
+        legacy_store.append_message('abc123', {'role': 'assistant', 'content': 'hi'})
+        messages = legacy_store['abc123']['messages']
+        assert [m['content'] for m in messages] == ['hello', 'hi']
+
+    def test_legacy_raw_messages_includes_side_log(self, legacy_store):
+        legacy_store.append_message('abc123', {'role': 'assistant', 'content': 'hi'})
+        decoded = [orjson.loads(b) for b in legacy_store.raw_messages('abc123')]
+        assert [m['content'] for m in decoded] == ['hello', 'hi']
+
+    def test_save_rewrites_as_pickle(self, legacy_store, tmp_path):
+        data = legacy_store['abc123']
+        legacy_store['abc123'] = data
+        assert (tmp_path / 'abc123.pkl').exists()
+        assert legacy_store['abc123'] == data
+
+
+class TestEdit:
+    """edit() applies read-modify-write atomically"""
+
+    def test_edit_persists_mutation(self, store, session):
+        store['abc123'] = session
+        with store.edit('abc123') as data:
+            data['dataset'] = {'filename': 'sales.csv'}
+        assert store['abc123']['dataset'] == {'filename': 'sales.csv'}